@@ -1,30 +1,173 @@
 # core/extractors.py
 import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from html import unescape
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from urllib.parse import urlsplit
+
+# selectolax (opcional): parser HTML en C, mucho más rápido que BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# google-re2 (opcional): coincidencia en tiempo lineal, sin backtracking
+try:
+    import re2 as _re
+except ImportError:
+    _re = re
+
+# regex (opcional): soporta clases Unicode (\p{Lu}, \p{Ll}) para nombres propios
+try:
+    import regex as _uregex
+except ImportError:
+    _uregex = None
+
+
+# ------------------------------------------------------------
+# PATRONES PRECOMPILADOS
+# ------------------------------------------------------------
+
+# Los patrones simples usan RE2 si está disponible; las banderas van en línea
+# porque la API de re2 no acepta el argumento flags de `re`.
+_EMAIL_RE = _re.compile(r"(?i)[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}")
+_PHONE_RE = _re.compile(
+    r"(?:\+?\d{1,3}[\s\-\.]?)?(?:\(?\d{2,4}\)?[\s\-\.]?)?\d{3,4}[\s\-\.]?\d{3,4}"
+)
+_NON_DIGIT_RE = _re.compile(r"[^\d+]")
+# Tabla de str.translate que borra todo carácter ASCII que no sea dígito o '+'
+_PHONE_KEEP_TABLE = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if chr(c) not in "0123456789+")
+)
+_LINK_RE = _re.compile(r"(?i)(https?://[^\s\"'<>]+)")
+_USERNAME_RE = _re.compile(r"(?i)(?:@|user/|u/)([a-zA-Z0-9._\-]{3,32})")
+# Los nombres no usan RE2: su \b solo reconoce ASCII y
+# cortaría nombres con acentos ("Álvaro", "Núñez"). Con el módulo `regex`
+# se aceptan mayúsculas/minúsculas de cualquier alfabeto (Ø, Ü, cirílico...)
+# y acentos combinados; sin él, se usa la lista de letras del español.
+if _uregex is not None:
+    _NAME_PAT = r"\b\p{Lu}[\p{Ll}\p{M}]+(?:\s\p{Lu}[\p{Ll}\p{M}]+)+"
+    _name_re = _uregex
+else:
+    _NAME_PAT = r"\b[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+"
+    _name_re = re
+_NAME_RE = _name_re.compile(_NAME_PAT)
+# Solo etiquetas con forma de etiqueta (<a, </a, <!--, <?xml): un '<' suelto
+# ("a < b") no debe tragarse el texto hasta el siguiente '>'.
+_TAG_RE = re.compile(r"<[A-Za-z/!?][^>]*>")
+
+# Dominio (sin "www.") -> red social
+_HOST_MAP = {
+    "facebook.com": "facebook",
+    "instagram.com": "instagram",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "tiktok.com": "tiktok",
+    "linkedin.com": "linkedin",
+    "github.com": "github",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+}
+
+
+def _dedup(items) -> List[str]:
+    """Elimina duplicados conservando el orden de aparición."""
+    seen = set()
+    out = []
+    add = seen.add
+    append = out.append
+    for x in items:
+        if x not in seen:
+            add(x)
+            append(x)
+    return out
+
+
+def _fresh(value):
+    """Copia listas/dicts de un resultado cacheado para que el llamador pueda mutarlos."""
+    if isinstance(value, dict):
+        return {k: _fresh(v) for k, v in value.items()}
+    return list(value)
+
+
+# resultados que guarda cada extractor memoizado
+_MEMO_SIZE = 512
+
+
+def _memoize(func):
+    """
+    Cachea (LRU) el resultado de un extractor por texto de entrada.
+    Las páginas repetidas (redirecciones, caché, consultas hermanas) no se
+    vuelven a escanear; cada llamada recibe su propia copia del resultado.
+    La clave es un hash de 16 bytes del texto, no el texto: la memoria no
+    crece con el tamaño de las páginas, solo con _MEMO_SIZE resultados.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(text: str):
+        if not isinstance(text, str):
+            return func(text)
+        key = blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with lock:
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+        if result is None:
+            result = func(text)
+            with lock:
+                cache[key] = result
+                if len(cache) > _MEMO_SIZE:
+                    cache.popitem(last=False)
+        return _fresh(result)
+
+    def cache_clear():
+        with lock:
+            cache.clear()
+
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def _strip_html(text: str) -> str:
+    """
+    Devuelve el texto visible de un HTML.
+    Si la entrada no puede contener etiquetas (falta '<' o '>') no se
+    construye ningún árbol: solo se decodifican las entidades (&amp;...) si
+    hay algún '&', y si no se devuelve tal cual. Es el caso del texto plano
+    que arma SiteSearcher con títulos y snippets.
+    """
+    if "<" not in text or ">" not in text:
+        return unescape(text) if "&" in text else text
+    if HTMLParser is not None:
+        return HTMLParser(text).text(separator=" ", strip=True)
+    return unescape(_TAG_RE.sub(" ", text))
 
 
 # ------------------------------------------------------------
 # FUNCIONES DE EXTRACCIÓN BÁSICA
 # ------------------------------------------------------------
 
+@_memoize
 def extract_emails(text: str) -> List[str]:
     """
     Extrae todas las direcciones de correo electrónico válidas de un texto o HTML.
     """
     if not text:
         return []
-    text = BeautifulSoup(text, "html.parser").get_text(" ", strip=True)
-    pattern = re.compile(
-        r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}",
-        re.IGNORECASE
-    )
-    emails = pattern.findall(text)
+    text = _strip_html(text)
+    emails = _EMAIL_RE.findall(text)
     # eliminar duplicados
-    emails = list(dict.fromkeys(emails))
+    emails = _dedup(emails)
     return emails
 
 
+@_memoize
 def extract_phones(text: str) -> List[str]:
     """
     Extrae posibles números telefónicos de texto o HTML.
@@ -32,37 +175,37 @@ def extract_phones(text: str) -> List[str]:
     """
     if not text:
         return []
-    text = BeautifulSoup(text, "html.parser").get_text(" ", strip=True)
-    pattern = re.compile(
-        r"(?:\+?\d{1,3}[\s\-\.]?)?(?:\(?\d{2,4}\)?[\s\-\.]?)?\d{3,4}[\s\-\.]?\d{3,4}",
-        re.MULTILINE
-    )
-    phones = pattern.findall(text)
-    # limpiar resultados
+    text = _strip_html(text)
+    return _clean_phones(_PHONE_RE.findall(text))
+
+
+def _clean_phones(phones: List[str]) -> List[str]:
+    """Deja solo dígitos y '+' y descarta longitudes no telefónicas."""
     clean = []
     for ph in phones:
-        ph2 = re.sub(r"[^\d+]", "", ph)
+        ph2 = ph.translate(_PHONE_KEEP_TABLE)
+        if not ph2.isascii():
+            # separadores Unicode (p. ej. espacio no separable): vía lenta
+            ph2 = _NON_DIGIT_RE.sub("", ph2)
         if 7 <= len(ph2) <= 15:
             clean.append(ph2)
-    clean = list(dict.fromkeys(clean))
+    clean = _dedup(clean)
     return clean
 
 
+@_memoize
 def extract_links(text: str) -> List[str]:
     """
     Extrae todos los enlaces HTTP/HTTPS válidos del texto o HTML.
     """
     if not text:
         return []
-    pattern = re.compile(
-        r"(https?://[^\s\"'<>]+)",
-        re.IGNORECASE
-    )
-    links = pattern.findall(text)
-    links = list(dict.fromkeys(links))
+    links = _LINK_RE.findall(text)
+    links = _dedup(links)
     return links
 
 
+@_memoize
 def extract_usernames(text: str) -> List[str]:
     """
     Extrae posibles nombres de usuario o alias de texto.
@@ -70,14 +213,10 @@ def extract_usernames(text: str) -> List[str]:
     """
     if not text:
         return []
-    text = BeautifulSoup(text, "html.parser").get_text(" ", strip=True)
-    pattern = re.compile(
-        r"(?:@|user/|u/)([a-zA-Z0-9._\-]{3,32})",
-        re.IGNORECASE
-    )
-    usernames = pattern.findall(text)
+    text = _strip_html(text)
+    usernames = _USERNAME_RE.findall(text)
     usernames = [u.lower() for u in usernames]
-    usernames = list(dict.fromkeys(usernames))
+    usernames = _dedup(usernames)
     return usernames
 
 
@@ -85,6 +224,7 @@ def extract_usernames(text: str) -> List[str]:
 # FUNCIONES AVANZADAS
 # ------------------------------------------------------------
 
+@_memoize
 def extract_social_profiles(text: str) -> Dict[str, List[str]]:
     """
     Identifica posibles enlaces o menciones a perfiles de redes sociales
@@ -94,7 +234,11 @@ def extract_social_profiles(text: str) -> Dict[str, List[str]]:
     if not text:
         return {}
 
-    links = extract_links(text)
+    return _profiles_from_links(extract_links(text))
+
+
+def _profiles_from_links(links: List[str]) -> Dict[str, List[str]]:
+    """Clasifica una lista de enlaces por red social."""
     profiles = {
         "facebook": [],
         "instagram": [],
@@ -106,27 +250,35 @@ def extract_social_profiles(text: str) -> Dict[str, List[str]]:
     }
 
     for url in links:
-        if "facebook.com" in url and "/profile" not in url:
-            profiles["facebook"].append(url)
-        elif "instagram.com" in url:
-            profiles["instagram"].append(url)
-        elif "twitter.com" in url or "x.com" in url:
-            profiles["twitter"].append(url)
-        elif "tiktok.com" in url:
-            profiles["tiktok"].append(url)
-        elif "linkedin.com" in url:
-            profiles["linkedin"].append(url)
-        elif "github.com" in url:
-            profiles["github"].append(url)
-        elif "youtube.com" in url or "youtu.be" in url:
-            profiles["youtube"].append(url)
+        platform = _platform_of(url)
+        if platform:
+            profiles[platform].append(url)
 
     # eliminar duplicados
     for k in profiles:
-        profiles[k] = list(dict.fromkeys(profiles[k]))
+        profiles[k] = _dedup(profiles[k])
     return profiles
 
 
+def _platform_of(url: str) -> str:
+    """Devuelve la red social de un enlace o "" si no corresponde a ninguna."""
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return ""
+    if host.startswith("www."):
+        host = host[4:]
+    platform = _HOST_MAP.get(host)
+    if platform is None:
+        # subdominios: m.facebook.com, mobile.twitter.com, ...
+        platform = _HOST_MAP.get(".".join(host.split(".")[-2:]), "")
+    if platform == "facebook" and "/profile" in parts.path:
+        return ""
+    return platform
+
+
+@_memoize
 def extract_possible_names(text: str) -> List[str]:
     """
     Extrae posibles nombres propios detectando palabras capitalizadas consecutivas.
@@ -134,10 +286,9 @@ def extract_possible_names(text: str) -> List[str]:
     """
     if not text:
         return []
-    text = BeautifulSoup(text, "html.parser").get_text(" ", strip=True)
-    pattern = re.compile(r"\b[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)+")
-    names = pattern.findall(text)
-    names = list(dict.fromkeys(names))
+    text = _strip_html(text)
+    names = _NAME_RE.findall(text)
+    names = _dedup(names)
     return names
 
 
@@ -145,21 +296,84 @@ def extract_possible_names(text: str) -> List[str]:
 # FUNCIÓN GLOBAL DE EXTRACCIÓN COMPLETA
 # ------------------------------------------------------------
 
+@_memoize
 def extract_all(text: str) -> Dict[str, Any]:
     """
     Realiza extracción completa de correos, teléfonos, URLs, usernames y redes.
     Retorna un diccionario con todos los resultados.
+    El HTML se limpia una sola vez para todos los patrones; el resultado es
+    el mismo que llamar a cada extractor por separado.
     """
+    if not text:
+        return {
+            "emails": [],
+            "phones": [],
+            "links": [],
+            "usernames": [],
+            "social_profiles": {},
+            "names": []
+        }
+
+    plain = _strip_html(text)
+    # un findall por patrón: las entidades pueden solaparse (el usuario o el
+    # teléfono dentro de un enlace, el dominio de un correo) y cada extractor
+    # individual las encuentra por separado; aquí tiene que ser igual
+    return _assemble(text, plain,
+                     _EMAIL_RE.findall(plain),
+                     _USERNAME_RE.findall(plain),
+                     _PHONE_RE.findall(plain),
+                     _NAME_RE.findall(plain))
+
+
+def _assemble(text, plain, emails, usernames, phones, names) -> Dict[str, Any]:
+    """Deduplica y normaliza las coincidencias crudas de una extracción."""
+    # como extract_links, los enlaces se buscan en el original (atributos href incluidos)
+    links = _dedup(_LINK_RE.findall(text))
     return {
-        "emails": extract_emails(text),
-        "phones": extract_phones(text),
-        "links": extract_links(text),
-        "usernames": extract_usernames(text),
-        "social_profiles": extract_social_profiles(text),
-        "names": extract_possible_names(text)
+        "emails": _dedup(emails),
+        "phones": _clean_phones(phones),
+        "links": links,
+        "usernames": _dedup(u.lower() for u in usernames),
+        "social_profiles": _profiles_from_links(links),
+        "names": _dedup(names)
     }
 
 
+# Separador entre textos en extract_all_many: ningún patrón cruza un salto
+# de línea seguido de NUL, así que no hay coincidencias entre dos textos.
+_BATCH_SEP = "\n\x00\n"
+
+
+def extract_all_many(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    extract_all para varios textos con una sola pasada de cada patrón.
+    Los textos se unen con un separador y cada coincidencia se asigna a su
+    texto por posición (bisect sobre los offsets de inicio). Devuelve un
+    resultado por texto, en el mismo orden e idéntico a extract_all(texto).
+    """
+    plains = [_strip_html(t) if t else "" for t in texts]
+    starts = []
+    pos = 0
+    for p in plains:
+        starts.append(pos)
+        pos += len(p) + len(_BATCH_SEP)
+    joined = _BATCH_SEP.join(plains)
+    # (patrón, grupo): como en extract_all, cada patrón se busca por separado
+    cols = []
+    for pattern, group in ((_EMAIL_RE, 0), (_USERNAME_RE, 1), (_PHONE_RE, 0), (_NAME_RE, 0)):
+        col = [[] for _ in plains]
+        for m in pattern.finditer(joined):
+            col[bisect_right(starts, m.start()) - 1].append(m.group(group))
+        cols.append(col)
+    out = []
+    for i, (text, plain) in enumerate(zip(texts, plains)):
+        if not text:
+            out.append(extract_all(text))
+        else:
+            out.append(_assemble(text, plain, *(col[i] for col in cols)))
+    return out
+
+
 # ------------------------------------------------------------
 # PRUEBA LOCAL
 # ------------------------------------------------------------
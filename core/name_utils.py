@@ -110,10 +110,11 @@ def name_variants_improved(fullname: str) -> List[str]:
             seen.add(u)
     return out
 
-def email_variants_from_name(fullname: str, domain_hints=None, max_per_domain=6) -> List[str]:
+def email_variants_from_name(fullname: str, domain_hints=None, max_per_domain=6, limit=None) -> List[str]:
     """
     Genera posibles correos electrónicos a partir de un nombre.
     Ejemplo: Juan Pérez -> juan.perez@gmail.com, jperez@hotmail.com, etc.
+    Con limit se para al llegar a 'limit' correos (mismo orden que sin él).
     """
     domains = list(domain_hints or []) + ["gmail.com", "hotmail.com", "yahoo.com", "outlook.com", "live.com"]
     names = name_variants_improved(fullname)
@@ -127,22 +128,18 @@ def email_variants_from_name(fullname: str, domain_hints=None, max_per_domain=6)
             extra.update([f"{first}.{last}", f"{first}{last}", f"{first[0]}{last}", f"{first}_{last}"])
     username_candidates = list(dict.fromkeys(username_candidates + sorted(extra)))
 
-    emails = []
-    for dom in domains:
-        count = 0
-        for user in username_candidates:
-            if count >= max_per_domain:
-                break
-            user_clean = re.sub(r'[^a-z0-9._\-]', '', user.lower())
-            if not user_clean:
-                continue
-            emails.append(f"{user_clean}@{dom}")
-            count += 1
+    # las partes locales no dependen del dominio: se limpian una sola vez
+    users = [u for u in (re.sub(r'[^a-z0-9._\-]', '', c.lower()) for c in username_candidates) if u]
+    users = users[:max_per_domain]
 
     seen = set()
     out = []
-    for e in emails:
-        if e not in seen:
-            seen.add(e)
-            out.append(e)
+    for dom in domains:
+        for user in users:
+            e = f"{user}@{dom}"
+            if e not in seen:
+                if limit is not None and len(out) >= limit:
+                    return out
+                seen.add(e)
+                out.append(e)
     return out
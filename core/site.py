@@ -1,11 +1,13 @@
 from concurrent.futures import ThreadPoolExecutor
-from core.utils import make_request, domain_of
+from core.utils import make_request, domain_of, get_session
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
+import copy
+import hashlib
 import re
 import time
 import random
-from typing import Dict, Any  # ¡IMPORTANTE: importar Dict y Any!
+from typing import Dict, Any, List  # ¡IMPORTANTE: importar Dict y Any!
 
 # Esto es necesario para la extracción posterior
 try:
@@ -13,6 +15,11 @@ try:
 except ImportError:
     extract_all = None
 
+try:
+    from core.extractors import extract_all_many
+except ImportError:
+    extract_all_many = None
+
 SEARCH_ENGINES = {
     "google": "https://www.google.com/search?q={query}",
     "bing": "https://www.bing.com/search?q={query}",
@@ -20,6 +27,9 @@ SEARCH_ENGINES = {
     "baidu": "https://www.baidu.com/s?wd={query}"
 }
 
+# dominios propios de los motores (se filtran de los resultados)
+_ENGINE_DOMAINS = frozenset({"google.com", "bing.com", "yandex.com", "baidu.com"})
+
 SOCIAL_SITES = [
     "facebook.com", "instagram.com", "twitter.com", "x.com", "tiktok.com",
     "github.com", "linkedin.com"
@@ -29,6 +39,46 @@ REPO_SITES = [
     "pastebin.com", "mediafire.com", "mega.nz", "drive.google.com", "github.com"
 ]
 
+# Extractor mínimo si core.extractors no está: un solo patrón con grupos
+# con nombre recorre el texto una vez y m.lastgroup indica qué se encontró
+_FALLBACK_RE = re.compile(
+    r"(?P<emails>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})"
+    r"|(?P<links>https?://[^\s'\"<>)]+)"
+    r"|(?P<phones>\+?\d[\d\s().-]{7,}\d)"
+)
+
+def _fallback_extract_all(text: str) -> Dict[str, Any]:
+    """
+    Correos, enlaces y teléfonos con _FALLBACK_RE; perfiles por dominio de
+    SOCIAL_SITES. Devuelve las mismas claves que extract_all, con
+    "usernames" y "names" siempre vacías.
+    Al ser una sola alternativa, los matches no se solapan: un enlace se
+    come los correos y teléfonos que lleve dentro de la URL (el mismo
+    solapamiento por el que extract_all usa un patrón por entidad).
+    """
+    found = {"emails": {}, "links": {}, "phones": {}}
+    for m in _FALLBACK_RE.finditer(text or ""):
+        found[m.lastgroup][m.group()] = None
+    links = list(found["links"])
+    socials = {}
+    for url in links:
+        site = domain_of(url)
+        site = site[4:] if site.startswith("www.") else site
+        if site in SOCIAL_SITES:
+            name = "twitter" if site == "x.com" else site.split(".")[0]
+            socials.setdefault(name, []).append(url)
+    return {
+        "emails": list(found["emails"]),
+        "phones": list(found["phones"]),
+        "links": links,
+        "usernames": [],
+        "names": [],
+        "social_profiles": socials,
+    }
+
+if extract_all is None:
+    extract_all = _fallback_extract_all
+
 def delay_random(min_delay=0.8, max_delay=2.5):
     """Espera un tiempo aleatorio para parecer más humano."""
     time.sleep(random.uniform(min_delay, max_delay))
@@ -36,13 +86,19 @@ def delay_random(min_delay=0.8, max_delay=2.5):
 class SiteSearcher:
     """Clase unificada de búsqueda OSINT."""
     
-    def __init__(self, client_headers=None, timeout=12, proxy=None, limiter=None, cache=None):
-        """Constructor sin parámetro 'limit' (se pasa en unified_search)"""
+    def __init__(self, client_headers=None, timeout=12, proxy=None, limiter=None, cache=None,
+                 session=None):
+        """
+        Constructor sin parámetro 'limit' (se pasa en unified_search).
+        session: requests.Session para todas las búsquedas de este searcher
+        (por defecto la sesión compartida de core.utils); quien la pasa la cierra.
+        """
         self.client_headers = client_headers
         self.timeout = timeout
         self.proxy = proxy
         self.limiter = limiter
         self.cache = cache
+        self.session = session if session is not None else get_session()
 
     def _extract_results_from_html(self, text, engine_name):
         """Extrae resultados específicos según el motor de búsqueda."""
@@ -97,27 +153,25 @@ class SiteSearcher:
         """Realiza búsqueda en motores específicos con límite de resultados."""
         results = []
         query_encoded = quote_plus(query)
+        # atributos y métodos ligados una vez fuera del bucle de motores
+        request_kwargs = dict(limiter=self.limiter, cache=self.cache, headers=self.client_headers,
+                              timeout=self.timeout, proxy=self.proxy, session=self.session)
+        parse = self._extract_results_from_html
+        extend = results.extend
         
         for name, url_template in SEARCH_ENGINES.items():
             if len(results) >= limit:
                 break
                 
             qurl = url_template.format(query=query_encoded)
-            status, html = make_request(
-                qurl, 
-                limiter=self.limiter, 
-                cache=self.cache,
-                headers=self.client_headers, 
-                timeout=self.timeout,
-                proxy=self.proxy
-            )
+            status, html = make_request(qurl, **request_kwargs)
             
             if status == 200 and html:
-                engine_results = self._extract_results_from_html(html, name)
+                engine_results = parse(html, name)
                 # Filtrar dominios de los motores de búsqueda
                 filtered = [r for r in engine_results 
-                           if domain_of(r['link']) not in ["google.com", "bing.com", "yandex.com", "baidu.com"]]
-                results.extend(filtered[:limit - len(results)])
+                           if domain_of(r['link']) not in _ENGINE_DOMAINS]
+                extend(filtered[:limit - len(results)])
                 
             delay_random()
             
@@ -145,10 +199,34 @@ class SiteSearcher:
             results.extend(repo_results)
         return results[:limit]
 
-    def unified_search(self, name, limit=10, include_socials=True, include_repos=True) -> Dict[str, Any]:
-        """Búsqueda unificada con parámetros correctos."""
+    def unified_search(self, name, limit=10, include_socials=True, include_repos=True,
+                       extract=True) -> Dict[str, Any]:
+        """
+        Búsqueda unificada con parámetros correctos.
+        Con extract=False no se extraen entidades: el bloque guarda el texto en
+        "_extraction_text" para procesar varios bloques juntos con extract_blocks().
+        Si el searcher tiene caché, el bloque completo se guarda en ella (con
+        su TTL), así repetir una búsqueda no vuelve a parsear ni a extraer
+        nada mientras la entrada no caduque.
+        """
+        if self.cache is None:
+            return self._unified_search(name, limit, include_socials, include_repos, extract)
+
+        key = repr((name, limit, include_socials, include_repos, extract))
+        disk_key = "SEARCH:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+        block = self.cache.get(disk_key)
+        if not isinstance(block, dict):
+            block = self._unified_search(name, limit, include_socials, include_repos, extract)
+            if not block["results"]:
+                # sin resultados suele ser un fallo de red: no se guarda
+                return block
+            self.cache.set(disk_key, block)
+        # quien llama puede modificar el bloque (setdefault, extract_blocks...)
+        return copy.deepcopy(block)
+
+    def _unified_search(self, name, limit, include_socials, include_repos, extract) -> Dict[str, Any]:
+        """Búsqueda sin memoización (ver unified_search)."""
         all_results = []
-        content_for_extraction = f"{name}\n"
         
         with ThreadPoolExecutor(max_workers=3) as executor:
             futures = [executor.submit(self.search_engines, name, limit)]
@@ -166,36 +244,101 @@ class SiteSearcher:
         # Eliminar duplicados manteniendo el orden
         seen_urls = set()
         clean_results = []
+        # una línea por resultado, unidas con un solo join al final
+        lines = [name]
         for r in all_results:
             url = r.get('link') or r.get('url', '')
             if url and url not in seen_urls:
                 seen_urls.add(url)
                 clean_results.append(r)
-                content_for_extraction += f"{r.get('title', '')} {r.get('snippet', '')} {url}\n"
+                lines.append(f"{r.get('title', '')} {r.get('snippet', '')} {url}")
+        lines.append("")
+        content_for_extraction = "\n".join(lines)
         
         clean_results = clean_results[:limit]
-        
+
+        block = {
+            "query": name,
+            "results": clean_results,
+            "entities": {},
+            "count": len(clean_results)
+        }
+        if not extract:
+            block["_extraction_text"] = content_for_extraction
+            return block
+
         # Extracción de entidades
-        entities = {}
         if extract_all:
             try:
-                extracted = extract_all(content_for_extraction)
-                # Procesar correctamente el formato de perfiles sociales
-                if extracted.get("social_profiles"):
-                    entities["socials"] = extracted["social_profiles"]  # Ya tiene formato correcto
-                # Incluir otros campos relevantes
-                for key in ["emails", "phones", "links", "usernames", "names"]:
-                    if extracted.get(key):
-                        entities[key] = extracted[key]
+                block["entities"] = self._entities_from(extract_all(content_for_extraction))
             except Exception as e:
                 print(f"Error en extracción de entidades: {e}")
-        
-        return {
-            "query": name,
-            "results": clean_results,
-            "entities": entities,
-            "count": len(clean_results)
-        }
+        return block
+
+    def batch_search(self, queries, limit=10, include_socials=True, include_repos=True,
+                     workers=4) -> List[Dict[str, Any]]:
+        """
+        Varias búsquedas en una llamada: devuelve un bloque por query en el
+        mismo orden. Las queries repetidas se buscan una sola vez, hasta
+        'workers' corren a la vez (con la sesión, el limiter y la caché de este
+        searcher) y las entidades de todos los bloques se extraen juntas al
+        final con extract_blocks().
+        """
+        unique = list(dict.fromkeys(queries))
+
+        def run(q):
+            try:
+                return self.unified_search(q, limit=limit, include_socials=include_socials,
+                                           include_repos=include_repos, extract=False)
+            except Exception as e:
+                print(f"Error en búsqueda '{q}': {e}")
+                return {"query": q, "results": [], "entities": {}, "count": 0, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+            by_query = dict(zip(unique, executor.map(run, unique)))
+        self.extract_blocks(list(by_query.values()))
+
+        # cada repetición recibe su propia copia del bloque
+        blocks = []
+        seen = set()
+        for q in queries:
+            block = by_query[q]
+            blocks.append(copy.deepcopy(block) if q in seen else block)
+            seen.add(q)
+        return blocks
+
+    @staticmethod
+    def _entities_from(extracted: Dict[str, Any]) -> Dict[str, Any]:
+        """Pasa el resultado de extract_all al formato de 'entities' del bloque."""
+        entities = {}
+        # Procesar correctamente el formato de perfiles sociales
+        if extracted.get("social_profiles"):
+            entities["socials"] = extracted["social_profiles"]  # Ya tiene formato correcto
+        # Incluir otros campos relevantes
+        for key in ["emails", "phones", "links", "usernames", "names"]:
+            if extracted.get(key):
+                entities[key] = extracted[key]
+        return entities
+
+    def extract_blocks(self, blocks):
+        """
+        Extrae las entidades de los bloques obtenidos con extract=False en una
+        sola pasada (extract_all_many) y elimina el texto temporal de cada uno.
+        """
+        pending = [b for b in blocks if isinstance(b, dict) and "_extraction_text" in b]
+        texts = [b.pop("_extraction_text") for b in pending]
+        if not pending or not extract_all:
+            return blocks
+        try:
+            if extract_all_many:
+                extracted = extract_all_many(texts)
+            else:
+                extracted = [extract_all(t) for t in texts]
+            for b, ex in zip(pending, extracted):
+                b["entities"] = self._entities_from(ex)
+        except Exception as e:
+            print(f"Error en extracción de entidades: {e}")
+        return blocks
 
 if __name__ == '__main__':
     print("Módulo SiteSearcher cargado. Ejecuta main.py o gui.py para usar la herramienta.")
\ No newline at end of file
@@ -4,10 +4,18 @@ Utils para el proyecto OSINT.
 
 Contiene:
  - HEADERS: user-agent por defecto
+ - TokenBucket: tope global de peticiones por segundo
  - DomainRateLimiter: control sencillo de tasa por dominio (delay + jitter)
  - SimpleCache: cache local en JSON con TTL (para respuestas HTTP mínimas)
+ - SqliteCache: misma interfaz que SimpleCache, respaldada por SQLite (inserciones O(1))
+ - open_cache: elige SqliteCache o SimpleCache según la extensión del archivo
+ - get_session / close_session: sesión HTTP compartida (keep-alive + pool de conexiones)
+ - build_session: sesión nueva con pool y reintentos (para quien quiera una propia)
+ - set_connection_limits: máximo de conexiones simultáneas por host y en total
  - fetch_url_text: realiza GET simple y devuelve (status_code, text)
  - make_request: envoltura que aplica limiter y cache (opcional)
+ - make_request_async / gather_urls: variante asyncio (aiohttp si está instalado)
+ - atomic_write_bytes: escritura atómica (temporal + os.replace)
  - save_json / load_json: utilidades para persistir resultados
  - save_csv: exportar listas/dicts simples a CSV
  - sanitize_filename: limpiar cadenas para nombres de archivo
@@ -15,16 +23,36 @@ Contiene:
 """
 
 from __future__ import annotations
+import asyncio
+import atexit
 import time
 import json
 import os
 import random
 import re
 import csv
-from typing import Optional, Tuple, Any, Dict
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Tuple, Any, Dict, Iterable, List
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson (opcional): codificador JSON en Rust, varias veces más rápido que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# aiohttp (opcional): peticiones concurrentes en un solo hilo
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 # User-Agent por defecto (puedes cambiar o ampliar leyendo data/user_agents.txt)
 HEADERS = {
@@ -32,9 +60,35 @@ HEADERS = {
                   "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
 }
 
+# -------------------------
+# Helpers: JSON compacto (orjson si está disponible)
+# -------------------------
+def _json_dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+    """Serializa a bytes UTF-8; usa orjson si está instalado y la sangría lo permite."""
+    separators = (",", ":") if indent is None else None
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # p. ej. cadenas con surrogates sueltos: json estándar escapando a ASCII
+            return json.dumps(obj, indent=indent, separators=separators).encode("ascii")
+    return json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
+
+def _json_loads(data) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # orjson rechaza surrogates escapados que json sí acepta
+            pass
+    return json.loads(data)
+
 # -------------------------
 # Helper: dominio de URL
 # -------------------------
+# memoizado: el limiter lo consulta en cada petición y las URLs se repiten
+@lru_cache(maxsize=4096)
 def domain_of(url: str) -> str:
     try:
         return urlparse(url).netloc.lower()
@@ -44,28 +98,94 @@ def domain_of(url: str) -> str:
 # -------------------------
 # Control de tasa por dominio
 # -------------------------
+class TokenBucket:
+    """
+    Cubeta de tokens: 'rate' peticiones por segundo con ráfagas de hasta
+    'capacity'. Cada acquire() reserva un token (aunque quede en deuda), así
+    los hilos/tareas concurrentes salen espaciados a 1/rate.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Toma un token y devuelve cuántos segundos hay que esperar por él."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1.0
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 class DomainRateLimiter:
     """
     Espera entre peticiones por dominio para evitar bloqueos.
     - min_delay: demora base en segundos
     - jitter: aleatoriza hasta +/- 40% para parecer más humano
+    - rps: tope global opcional de peticiones por segundo (TokenBucket)
     """
-    def __init__(self, min_delay: float = 1.5):
+    def __init__(self, min_delay: float = 1.5, rps: Optional[float] = None):
         self.min_delay = float(min_delay)
         self._last: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.bucket = TokenBucket(rps) if rps else None
+
+    def defer(self, url: str, seconds: float):
+        """Aplaza el siguiente turno del dominio (p. ej. por un Retry-After)."""
+        d = domain_of(url)
+        if not d:
+            return
+        with self._lock:
+            self._last[d] = max(self._last.get(d, 0.0), time.monotonic() + seconds)
 
     def wait(self, url: str):
+        """
+        Bloquea hasta el turno de este dominio. El turno se reserva con el
+        lock tomado, así varios hilos hacia el mismo dominio no salen juntos.
+        """
+        if self.bucket is not None:
+            self.bucket.acquire()
+        d = domain_of(url)
+        if not d:
+            return
+        jitter = random.uniform(0, self.min_delay * 0.4)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._last.get(d, 0.0) + self.min_delay + jitter)
+            self._last[d] = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    async def wait_async(self, url: str):
+        """
+        Igual que wait() pero con asyncio.sleep.
+        El turno se reserva antes de dormir, así las tareas concurrentes
+        hacia el mismo dominio quedan espaciadas entre sí.
+        """
+        if self.bucket is not None:
+            await self.bucket.acquire_async()
         d = domain_of(url)
         if not d:
             return
-        last = self._last.get(d, 0.0)
-        now = time.time()
+        now = time.monotonic()
         jitter = random.uniform(0, self.min_delay * 0.4)
-        wait_for = self.min_delay + jitter
-        to_wait = last + wait_for - now
-        if to_wait > 0:
-            time.sleep(to_wait)
-        self._last[d] = time.time()
+        slot = max(now, self._last.get(d, 0.0) + self.min_delay + jitter)
+        self._last[d] = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
 # -------------------------
 # Caché simple JSON en disco
@@ -76,18 +196,34 @@ class SimpleCache:
     Guarda pares key -> {"value": ..., "_fetched_at": epoch}
     - path: ruta al archivo
     - ttl: tiempo de vida en segundos
+    - flush_every: segundos mínimos entre escrituras a disco; los cambios
+      intermedios quedan en memoria y se vuelcan con flush() o al salir
     """
-    def __init__(self, path: str = ".osint_cache.json", ttl: int = 86400):
+    def __init__(self, path: str = ".osint_cache.json", ttl: int = 86400, flush_every: float = 5.0):
         self.path = path
         self.ttl = int(ttl)
+        self.flush_every = float(flush_every)
         self._data: dict = {}
+        # mtime del archivo tras nuestra última lectura/escritura (changed_on_disk)
+        self._disk_mtime: Optional[int] = None
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
         self._load()
+        atexit.register(self.flush)
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
 
     def _load(self):
+        self._disk_mtime = self._file_mtime()
         try:
             if os.path.isfile(self.path):
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self._data = json.load(f)
+                with open(self.path, "rb") as f:
+                    self._data = _json_loads(f.read())
             else:
                 self._data = {}
         except Exception:
@@ -96,11 +232,36 @@ class SimpleCache:
 
     def _save(self):
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                data = _json_dumps(self._data)
+                self._dirty = False
+                self._last_flush = time.monotonic()
+            # escritura atómica: un corte a mitad no deja la caché truncada
+            atomic_write_bytes(self.path, data)
+            self._disk_mtime = self._file_mtime()
         except Exception:
             pass
 
+    def changed_on_disk(self) -> bool:
+        """True si otro proceso reescribió el archivo desde nuestra última lectura/escritura."""
+        return self._file_mtime() != self._disk_mtime
+
+    def close(self):
+        """Vuelca lo pendiente; la instancia deja de registrarse para atexit."""
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def _touch(self):
+        """Marca la caché como modificada y la vuelca si pasó flush_every."""
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_every:
+            self._save()
+
+    def flush(self):
+        """Escribe a disco los cambios pendientes, si los hay."""
+        if self._dirty:
+            self._save()
+
     def get(self, key: str) -> Optional[Any]:
         rec = self._data.get(key)
         if not rec:
@@ -109,8 +270,9 @@ class SimpleCache:
         if time.time() - ts > self.ttl:
             # expirado: eliminar y devolver None
             try:
-                del self._data[key]
-                self._save()
+                with self._lock:
+                    del self._data[key]
+                self._touch()
             except Exception:
                 pass
             return None
@@ -118,71 +280,369 @@ class SimpleCache:
 
     def set(self, key: str, value: Any):
         try:
-            self._data[key] = {"value": value, "_fetched_at": time.time()}
-            self._save()
+            with self._lock:
+                self._data[key] = {"value": value, "_fetched_at": time.time()}
+            self._touch()
         except Exception:
             pass
 
     def clear(self):
-        self._data = {}
+        with self._lock:
+            self._data = {}
+            self._dirty = False
         try:
             if os.path.isfile(self.path):
                 os.remove(self.path)
         except Exception:
             pass
 
+# -------------------------
+# Caché SQLite en disco
+# -------------------------
+class SqliteCache:
+    """
+    Caché con la misma interfaz que SimpleCache, guardada en SQLite.
+    Cada set() escribe solo su propia fila en lugar de reescribir todo el archivo.
+    - path: ruta al archivo .sqlite
+    - ttl: tiempo de vida en segundos
+    """
+    def __init__(self, path: str = ".osint_cache.sqlite", ttl: int = 86400):
+        self.path = path
+        self.ttl = int(ttl)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # con WAL, NORMAL no arriesga la integridad y evita un fsync por set()
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS kv(k TEXT PRIMARY KEY, v BLOB, ts REAL)")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT v, ts FROM kv WHERE k=?", (key,)).fetchone()
+                if not row:
+                    return None
+                if time.time() - row[1] > self.ttl:
+                    # expirado: eliminar y devolver None
+                    self._conn.execute("DELETE FROM kv WHERE k=?", (key,))
+                    return None
+            return _json_loads(row[0])
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any):
+        try:
+            data = _json_dumps(value)
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, data, time.time()))
+        except Exception:
+            pass
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM kv")
+        except Exception:
+            pass
+
+    def flush(self):
+        # cada set() ya queda confirmado (autocommit); se mantiene por compatibilidad con SimpleCache
+        pass
+
+    def changed_on_disk(self) -> bool:
+        # SQLite ve en cada consulta lo que escriben otros procesos: nunca hay que reabrir
+        return False
+
+    def close(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+def open_cache(path: str, ttl: int = 86400):
+    """Devuelve SqliteCache para rutas .sqlite/.db y SimpleCache (JSON) para el resto."""
+    if path.lower().endswith((".sqlite", ".sqlite3", ".db")):
+        return SqliteCache(path=path, ttl=ttl)
+    return SimpleCache(path=path, ttl=ttl)
+
+# -------------------------
+# Sesión HTTP compartida
+# -------------------------
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+# Límites de conexiones simultáneas (como los navegadores: ~6 por host)
+MAX_CONNS_PER_HOST = 6
+MAX_CONNS_TOTAL = 100
+_HOST_SEMS: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_SEMS_LOCK = threading.Lock()
+_TOTAL_SEM = threading.BoundedSemaphore(MAX_CONNS_TOTAL)
+
+def set_connection_limits(per_host: int = 6, total: int = 100):
+    """
+    Cambia los límites de conexiones simultáneas por host y en total.
+    La sesión compartida se recrea con un pool del tamaño nuevo.
+    """
+    global MAX_CONNS_PER_HOST, MAX_CONNS_TOTAL, _TOTAL_SEM
+    with _HOST_SEMS_LOCK:
+        MAX_CONNS_PER_HOST = max(1, int(per_host))
+        MAX_CONNS_TOTAL = max(1, int(total))
+        _HOST_SEMS.clear()
+        _TOTAL_SEM = threading.BoundedSemaphore(MAX_CONNS_TOTAL)
+    close_session()
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    """Semáforo (creado al primer uso) que limita las conexiones a un host."""
+    host = domain_of(url)
+    sem = _HOST_SEMS.get(host)
+    if sem is None:
+        with _HOST_SEMS_LOCK:
+            sem = _HOST_SEMS.setdefault(host, threading.BoundedSemaphore(MAX_CONNS_PER_HOST))
+    return sem
+
+def get_session() -> requests.Session:
+    """
+    Devuelve una sesión HTTP compartida por todo el proceso.
+    Reutiliza conexiones TCP/TLS (keep-alive) entre peticiones al mismo dominio.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = build_session()
+    return _SESSION
+
+def build_session(pool_connections: int = 32, retries: int = 2) -> requests.Session:
+    """
+    Crea una sesión con pool de conexiones keep-alive y reintentos ante
+    fallos de conexión y 500/502/504 (con backoff). 429/503 no se reintentan
+    aquí: make_request los trata según Retry-After y el limiter.
+    """
+    s = requests.Session()
+    retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=0.5,
+                  status_forcelist=(500, 502, 504), allowed_methods=frozenset({"GET", "HEAD"}),
+                  raise_on_status=False, respect_retry_after_header=False)
+    # pool_maxsize es por host: no hace falta más que el límite por host
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=MAX_CONNS_PER_HOST,
+                          max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def close_session():
+    """Cierra la sesión compartida (se recrea en la siguiente petición)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+
 # -------------------------
 # Petición HTTP básica
 # -------------------------
+# Espera máxima que se acepta de un Retry-After antes de reintentar
+RETRY_AFTER_MAX = 60.0
+# Respuestas de "demasiadas peticiones": se reintentan y nunca se cachean
+_THROTTLED = (429, 503)
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Interpreta Retry-After (segundos o fecha HTTP); None si falta o no se entiende."""
+    if not value:
+        return None
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            secs = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, secs), RETRY_AFTER_MAX)
+
+def _fetch(url: str, headers: Optional[dict], timeout: int, proxies: Optional[dict],
+           session: Optional[requests.Session]) -> Tuple[Optional[int], Optional[str], Optional[float]]:
+    """GET con los límites de conexiones; devuelve (status_code, text, retry_after)."""
+    try:
+        with _host_semaphore(url), _TOTAL_SEM:
+            r = (session or get_session()).get(url, headers=headers or HEADERS, timeout=timeout, proxies=proxies)
+        # algunos sitios devuelven bytes mal codificados; r.text intenta decodificar
+        return r.status_code, r.text, _retry_after_seconds(r.headers.get("Retry-After"))
+    except Exception:
+        return None, None, None
+
 def fetch_url_text(url: str, headers: Optional[dict] = None, timeout: int = 12,
-                   proxies: Optional[dict] = None) -> Tuple[Optional[int], Optional[str]]:
+                   proxies: Optional[dict] = None,
+                   session: Optional[requests.Session] = None) -> Tuple[Optional[int], Optional[str]]:
     """
     Realiza un GET a 'url' y devuelve (status_code, text).
     En caso de error devuelve (None, None).
+    Usa la sesión compartida (get_session) salvo que se pase otra.
+    Respeta MAX_CONNS_PER_HOST / MAX_CONNS_TOTAL conexiones simultáneas.
     No aplica rate-limiter ni cache: función atómica.
     """
-    try:
-        r = requests.get(url, headers=headers or HEADERS, timeout=timeout, proxies=proxies)
-        # algunos sitios devuelven bytes mal codificados; r.text intenta decodificar
-        return r.status_code, r.text
-    except Exception:
-        return None, None
+    status, text, _ = _fetch(url, headers, timeout, proxies, session)
+    return status, text
 
 # -------------------------
 # make_request: aplicando limiter y cache (opcional)
 # -------------------------
+class _Flight:
+    """Petición en curso compartida por quienes piden la misma URL a la vez."""
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Tuple[Optional[int], Optional[str]] = (None, None)
+
+_INFLIGHT: Dict[str, _Flight] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
 def make_request(url: str,
                  limiter: Optional[DomainRateLimiter] = None,
                  cache: Optional[SimpleCache] = None,
                  use_cache: bool = True,
                  timeout: int = 12,
                  headers: Optional[dict] = None,
-                 proxy: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+                 proxy: Optional[str] = None,
+                 session: Optional[requests.Session] = None) -> Tuple[Optional[int], Optional[str]]:
     """
     Envoltura que aplica:
-      - limiter.wait(url) si se pasa un limiter
       - cache.get / cache.set si se pasa SimpleCache y use_cache=True
+      - agrupa peticiones simultáneas a la misma URL: solo una sale a la red
+        y las demás reciben su resultado (p. ej. github.com está tanto en
+        las búsquedas sociales como en las de repositorios)
+      - limiter.wait(url) si se pasa un limiter, solo para la que sale a la red
       - llama a fetch_url_text para obtener el contenido
+      - ante 429/503 con Retry-After, aplaza el dominio y reintenta una vez
 
     Devuelve (status_code, text) o (None, None) en error.
     """
+    key = f"GET:{url}"
+    if use_cache and cache:
+        cached = cache.get(key)
+        if cached and isinstance(cached, dict):
+            # cached expected structure: {"status_code": int, "text": str}
+            return cached.get("status_code"), cached.get("text")
+
+    with _INFLIGHT_LOCK:
+        flight = _INFLIGHT.get(key)
+        leader = flight is None
+        if leader:
+            flight = _INFLIGHT[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        return flight.result
+
+    try:
+        flight.result = _fetch_limited(url, key, limiter, cache, use_cache, timeout, headers, proxy, session)
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+        flight.done.set()
+    return flight.result
+
+def _fetch_limited(url, key, limiter, cache, use_cache, timeout, headers, proxy,
+                   session) -> Tuple[Optional[int], Optional[str]]:
+    """Parte de make_request que sale a la red: limiter, GET, Retry-After y cache.set."""
     if limiter:
         try:
             limiter.wait(url)
         except Exception:
             pass
 
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+    status, text, retry_after = _fetch(url, headers, timeout, proxies, session)
+    if status in _THROTTLED and retry_after is not None:
+        # el aplazamiento queda en el limiter: las demás peticiones al mismo
+        # dominio esperan su turno detrás de este reintento en vez de insistir
+        waited = False
+        if limiter:
+            # como en la primera espera: un limiter que falla no aborta la petición
+            try:
+                limiter.defer(url, retry_after)
+                limiter.wait(url)
+                waited = True
+            except Exception:
+                pass
+        if not waited:
+            time.sleep(retry_after)
+        status, text, _ = _fetch(url, headers, timeout, proxies, session)
+
+    if use_cache and cache and status is not None and status not in _THROTTLED:
+        try:
+            cache.set(key, {"status_code": status, "text": text})
+        except Exception:
+            pass
+
+    return status, text
+
+# -------------------------
+# Variante asíncrona (asyncio + aiohttp)
+# -------------------------
+async def _fetch_async(session, url: str, headers: Optional[dict], timeout: int,
+                       proxy: Optional[str]) -> Tuple[Optional[int], Optional[str], Optional[float]]:
+    """GET asíncrono; devuelve (status_code, text, retry_after) como _fetch."""
+    if aiohttp is None or session is None:
+        proxies = {"http": proxy, "https": proxy} if proxy else None
+        return await asyncio.to_thread(_fetch, url, headers, timeout, proxies, None)
+    try:
+        async with session.get(url, headers=headers or HEADERS, proxy=proxy,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            return (r.status, await r.text(errors="replace"),
+                    _retry_after_seconds(r.headers.get("Retry-After")))
+    except Exception:
+        return None, None, None
+
+async def fetch_url_text_async(session, url: str, headers: Optional[dict] = None, timeout: int = 12,
+                               proxy: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+    """
+    GET asíncrono que devuelve (status_code, text) o (None, None) en error.
+    Con aiohttp usa 'session' (aiohttp.ClientSession); sin aiohttp delega
+    fetch_url_text a un hilo para no bloquear el event loop.
+    """
+    status, text, _ = await _fetch_async(session, url, headers, timeout, proxy)
+    return status, text
+
+async def make_request_async(url: str,
+                             session=None,
+                             limiter: Optional[DomainRateLimiter] = None,
+                             cache: Optional[SimpleCache] = None,
+                             use_cache: bool = True,
+                             timeout: int = 12,
+                             headers: Optional[dict] = None,
+                             proxy: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Versión asíncrona de make_request (mismo limiter, misma caché y mismas
+    claves): la caché se consulta antes del limiter, ante 429/503 con
+    Retry-After se aplaza el dominio y se reintenta una vez, y esas
+    respuestas nunca se cachean.
+    """
     key = f"GET:{url}"
     if use_cache and cache:
         cached = cache.get(key)
         if cached and isinstance(cached, dict):
-            # cached expected structure: {"status_code": int, "text": str}
             return cached.get("status_code"), cached.get("text")
 
-    proxies = {"http": proxy, "https": proxy} if proxy else None
-    status, text = fetch_url_text(url, headers=headers or HEADERS, timeout=timeout, proxies=proxies)
+    if limiter:
+        try:
+            await limiter.wait_async(url)
+        except Exception:
+            pass
 
-    if use_cache and cache and status is not None:
+    status, text, retry_after = await _fetch_async(session, url, headers, timeout, proxy)
+    if status in _THROTTLED and retry_after is not None:
+        waited = False
+        if limiter:
+            try:
+                limiter.defer(url, retry_after)
+                await limiter.wait_async(url)
+                waited = True
+            except Exception:
+                pass
+        if not waited:
+            await asyncio.sleep(retry_after)
+        status, text, _ = await _fetch_async(session, url, headers, timeout, proxy)
+
+    if use_cache and cache and status is not None and status not in _THROTTLED:
         try:
             cache.set(key, {"status_code": status, "text": text})
         except Exception:
@@ -190,21 +650,74 @@ def make_request(url: str,
 
     return status, text
 
+async def gather_urls(urls: List[str],
+                      limiter: Optional[DomainRateLimiter] = None,
+                      cache: Optional[SimpleCache] = None,
+                      concurrency: int = 32,
+                      **kwargs) -> List[Tuple[Optional[int], Optional[str]]]:
+    """
+    Descarga varias URLs en paralelo (como máximo 'concurrency' a la vez).
+    Devuelve los (status_code, text) en el mismo orden que 'urls'.
+    kwargs se pasan a make_request_async (timeout, headers, proxy, use_cache).
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def bounded(u, session):
+        async with sem:
+            return await make_request_async(u, session=session, limiter=limiter, cache=cache, **kwargs)
+
+    if aiohttp is None:
+        return await asyncio.gather(*(bounded(u, None) for u in urls))
+    connector = aiohttp.TCPConnector(limit=MAX_CONNS_TOTAL, limit_per_host=MAX_CONNS_PER_HOST)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*(bounded(u, session) for u in urls))
+
 # -------------------------
 # Utilidades de persistencia y formato
 # -------------------------
+# ASCII no permitido -> "_" en una sola pasada de str.translate
+_FN_TABLE = str.maketrans({c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c in "-_. ")})
+_FN_NONASCII_RE = re.compile(r"[^\w\-_\. ]")
+_FN_SPACES_RE = re.compile(r" +")
+
+def atomic_write_bytes(path: str, data: bytes, durable: bool = False):
+    """
+    Escribe 'data' en un temporal y lo renombra sobre 'path' (os.replace).
+    Si el proceso muere a mitad, el archivo anterior queda intacto.
+    - durable: hace fsync antes de renombrar (más lento, sobrevive a cortes de luz)
+    """
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
 def sanitize_filename(s: str) -> str:
     """Limpia una cadena para usarla como nombre de archivo."""
-    s2 = s.strip().lower()
-    s2 = re.sub(r"[^\w\-_\. ]", "_", s2)
-    s2 = re.sub(r"\s+", "_", s2)
+    s2 = s.strip().lower().translate(_FN_TABLE)
+    if not s2.isascii():
+        s2 = _FN_NONASCII_RE.sub("_", s2)
+    if " " in s2:
+        s2 = _FN_SPACES_RE.sub("_", s2)
     return s2[:240]
 
 def save_json(obj: Any, path: str, ensure_ascii: bool = False, indent: int = 2) -> str:
     """Guarda objeto como JSON y devuelve la ruta."""
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(obj, f, ensure_ascii=ensure_ascii, indent=indent)
+        if ensure_ascii:
+            data = json.dumps(obj, ensure_ascii=True, indent=indent).encode("ascii")
+        else:
+            data = _json_dumps(obj, indent=indent)
+        atomic_write_bytes(path, data, durable=True)
         return path
     except Exception as e:
         raise
@@ -217,41 +730,40 @@ def load_json(path: str) -> Any:
     except Exception:
         return None
 
-def save_csv_rows(path: str, headers: list[str], rows: list[list[Any]]) -> str:
+def save_csv_rows(path: str, headers: list[str], rows: Iterable[Iterable[Any]]) -> str:
     """
-    Guarda una lista de filas en CSV.
+    Guarda filas en CSV.
     - headers: lista de cabeceras
-    - rows: lista de filas (listas)
+    - rows: filas (listas, tuplas o un generador; no hace falta materializarlas)
+    csv.writer ya escribe None como "" y convierte el resto con str(),
+    así que las filas se pasan tal cual a writerows.
     """
     try:
         with open(path, "w", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             if headers:
                 w.writerow(headers)
-            for r in rows:
-                w.writerow([str(x) if x is not None else "" for x in r])
+            w.writerows(rows)
         return path
     except Exception:
         raise
 
-def save_dicts_to_csv(path: str, fieldnames: list[str], dicts: list[dict]) -> str:
+def _csv_cell(v: Any) -> Any:
+    # convertir listas a ;joined strings para campos simples
+    if isinstance(v, list):
+        return ";".join([str(x) for x in v])
+    return v
+
+def save_dicts_to_csv(path: str, fieldnames: list[str], dicts: Iterable[dict]) -> str:
     """
-    Guarda una lista de dicts en CSV respetando fieldnames (orden).
+    Guarda dicts en CSV respetando fieldnames (orden).
+    'dicts' puede ser cualquier iterable: las filas se escriben a medida que llegan.
     """
     try:
         with open(path, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            for d in dicts:
-                # convertir listas a ;joined strings para campos simples
-                row = {}
-                for k in fieldnames:
-                    v = d.get(k, "")
-                    if isinstance(v, list):
-                        row[k] = ";".join([str(x) for x in v])
-                    else:
-                        row[k] = v
-                w.writerow(row)
+            w = csv.writer(f)
+            w.writerow(fieldnames)
+            w.writerows([_csv_cell(d.get(k, "")) for k in fieldnames] for d in dicts)
         return path
     except Exception:
         raise
@@ -263,15 +775,21 @@ def now() -> str:
     """Timestamp legible."""
     return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
+@lru_cache(maxsize=8)
+def _load_agents(path: str, mtime: float) -> tuple:
+    """Lee el archivo de user-agents una vez por (ruta, mtime)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return tuple(line.strip() for line in f if line.strip())
+
 def random_user_agent_from_file(path: str) -> str:
     """
     Si existe un archivo con varios user-agents (uno por línea), devuelve uno aleatorio.
     Si no existe o falla, devuelve HEADERS['User-Agent'] por defecto.
+    El archivo se lee una sola vez y se relee solo si cambia su fecha de modificación.
     """
     try:
         if os.path.isfile(path):
-            with open(path, "r", encoding="utf-8") as f:
-                agents = [line.strip() for line in f if line.strip()]
+            agents = _load_agents(path, os.path.getmtime(path))
             if agents:
                 return random.choice(agents)
     except Exception:
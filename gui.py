@@ -2,13 +2,17 @@
 # Interfaz gráfica para osint_tool (Tkinter) - VERSIÓN CORREGIDA
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 import threading
+import collections
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 import json
 import os
+import queue
+import re
 import traceback
-import time
-import random
 
 # Importaciones CORRECTAS desde el paquete core
 try:
@@ -23,35 +27,59 @@ except ImportError:
     name_variants_improved = None
     email_variants_from_name = None
 
-try:
-    from core.extractors import extract_all
-except ImportError:
-    extract_all = None
+
+def _memoize_variants(func):
+    """
+    Cachea (LRU) un generador de variantes: repetir la misma búsqueda desde
+    la interfaz no recalcula las combinaciones. Se guarda una tupla y cada
+    llamada recibe su propia lista.
+    """
+    cached = functools.lru_cache(maxsize=256)(lambda *args, **kwargs: tuple(func(*args, **kwargs)))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return list(cached(*args, **kwargs))
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+if name_variants_improved is not None:
+    name_variants_improved = _memoize_variants(name_variants_improved)
+if email_variants_from_name is not None:
+    email_variants_from_name = _memoize_variants(email_variants_from_name)
 
 try:
-    from core.utils import DomainRateLimiter, SimpleCache, save_json, sanitize_filename
+    from core.utils import DomainRateLimiter, open_cache, save_json, sanitize_filename
 except ImportError:
     DomainRateLimiter = None
-    SimpleCache = None
+    open_cache = None
     save_json = None
     sanitize_filename = None
 
 # Fallback si sanitize_filename no está disponible
+_INVALID_FN_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_WS_RE = re.compile(r'\s+')
+
 if sanitize_filename is None:
     def sanitize_filename(name: str) -> str:
         """Sanitiza nombre para sistema de archivos (versión segura)"""
         if not name:
             return "unnamed_result"
         # Eliminar SOLO caracteres peligrosos para sistemas de archivos
-        invalid = r'[<>:"/\\|?*\x00-\x1f]'
-        s2 = re.sub(invalid, "_", name.strip())
+        s2 = _INVALID_FN_RE.sub("_", name.strip())
         # Reemplazar espacios consecutivos
-        s2 = re.sub(r'\s+', "_", s2)
+        s2 = _WS_RE.sub("_", s2)
         # Evitar nombres que comiencen/terminen con puntos o guiones bajos
         s2 = s2.strip("._")
         return s2[:240] or "file"
 
 APP_TITLE = "OSINT Tool — GUI"
+LOG_POLL_MS = 50            # cada cuánto se vuelca la cola de log al widget
+LOG_CHUNK_BYTES = 64 * 1024 # tamaño máximo de cada insert en el widget
+LOG_MAX_LINES = 5000        # líneas que se conservan en el widget de log
+RESULT_COLUMNS = ("engine", "title", "link", "snippet")
+RESULTS_DIR = "results"
 
 class OSINTGUI(tk.Tk):
     def __init__(self):
@@ -69,8 +97,19 @@ class OSINTGUI(tk.Tk):
         self.status_var = tk.StringVar(value="Listo")
 
         self.search_result = None
+        # líneas pendientes de mostrar; deque.append es seguro entre hilos
+        self._log_queue = collections.deque()
+        # caché reutilizada entre búsquedas (se reabre si cambia el archivo)
+        self._cache = None
+        self._cache_path = None
+        # la carpeta de salida se crea una vez, no en cada guardado
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        # un único hilo de trabajo atiende las búsquedas encoladas por _on_run
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._worker_loop, daemon=True).start()
 
         self._build_ui()
+        self.after(LOG_POLL_MS, self._drain_log)
 
     def _build_ui(self):
         frm = ttk.Frame(self, padding=8)
@@ -111,17 +150,94 @@ class OSINTGUI(tk.Tk):
         self.progress.grid(row=row+5, column=0, columnspan=6, pady=(4,8))
         ttk.Label(frm, textvariable=self.status_var).grid(row=row+6, column=0, columnspan=6, sticky="w")
 
-        self.results_text = tk.Text(frm, height=28, wrap="word", bg="#111", fg="#e6e6e6", insertbackground="#fff")
-        self.results_text.grid(row=row+7, column=0, columnspan=6, sticky="nsew", pady=(8,0))
+        # Tabla de resultados: Treeview solo pinta las filas visibles
+        tree_frm = ttk.Frame(frm)
+        tree_frm.grid(row=row+7, column=0, columnspan=6, sticky="nsew", pady=(8,0))
+        self.results_tree = ttk.Treeview(tree_frm, columns=RESULT_COLUMNS, show="headings", height=10)
+        for col, width in zip(RESULT_COLUMNS, (70, 240, 300, 280)):
+            self.results_tree.heading(col, text=col.capitalize())
+            self.results_tree.column(col, width=width, stretch=(col != "engine"))
+        tree_scroll = ttk.Scrollbar(tree_frm, orient="vertical", command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=tree_scroll.set)
+        self.results_tree.pack(side="left", fill="both", expand=True)
+        tree_scroll.pack(side="right", fill="y")
+
+        # Log de estado / depuración
+        self.results_text = tk.Text(frm, height=16, wrap="word", bg="#111", fg="#e6e6e6", insertbackground="#fff")
+        self.results_text.grid(row=row+8, column=0, columnspan=6, sticky="nsew", pady=(8,0))
         frm.rowconfigure(row+7, weight=1)
+        frm.rowconfigure(row+8, weight=1)
         frm.columnconfigure(1, weight=1)
 
-    def _log(self, line: str):
-        self.results_text.insert("end", line + "\n")
-        self.results_text.see("end")
-        self.update_idletasks()  # Actualizar UI inmediatamente
+    def _show_results(self, results):
+        """Rellena la tabla de resultados (se llama desde el hilo de Tk)."""
+        self.results_tree.delete(*self.results_tree.get_children())
+        for r in results:
+            self.results_tree.insert("", "end", values=(
+                r.get("engine", ""), r.get("title", ""),
+                r.get("link") or r.get("url", ""), r.get("snippet", "")
+            ))
+
+    def _log(self, line: str, items=None):
+        """
+        Encola una línea; _drain_log la pinta en el siguiente ciclo.
+        Con 'items', la línea es un prefijo y la lista se une en el drenado:
+        si el log se limpia antes, el join nunca se paga.
+        """
+        self._log_queue.append(line if items is None else (line, items))
+
+    def _drain_log(self):
+        """Vuelca al widget todas las líneas encoladas con un insert por bloque de 64 KiB."""
+        try:
+            if self._log_queue:
+                chunk = []
+                size = 0
+                while self._log_queue:
+                    line = self._log_queue.popleft()
+                    if isinstance(line, tuple):
+                        prefix, items = line
+                        line = prefix + ", ".join(items)
+                    chunk.append(line)
+                    size += len(line) + 1
+                    if size >= LOG_CHUNK_BYTES:
+                        self.results_text.insert("end", "\n".join(chunk) + "\n")
+                        chunk, size = [], 0
+                if chunk:
+                    self.results_text.insert("end", "\n".join(chunk) + "\n")
+                # ventana deslizante: el Text de Tk se vuelve lento al crecer sin límite
+                lines = int(self.results_text.index("end-1c").split(".")[0])
+                if lines > LOG_MAX_LINES:
+                    self.results_text.delete("1.0", f"{lines - LOG_MAX_LINES}.0")
+                self.results_text.see("end")
+        finally:
+            self.after(LOG_POLL_MS, self._drain_log)
+
+    def _get_cache(self, path: str):
+        """
+        Devuelve la caché para 'path' sin releer el archivo en cada búsqueda.
+        Solo se reabre si cambia la ruta o si la propia caché detecta que otro
+        proceso reescribió su archivo (changed_on_disk; SQLite nunca lo necesita).
+        """
+        if self._cache is not None and self._cache_path == path:
+            changed = getattr(self._cache, "changed_on_disk", None)
+            if not (changed and changed()):
+                return self._cache
+        if self._cache is not None:
+            # cerrar la anterior: vuelca lo pendiente y libera la conexión SQLite
+            close = getattr(self._cache, "close", None) or self._cache.flush
+            close()
+        self._cache = open_cache(path=path, ttl=86400)
+        self._cache_path = path
+        return self._cache
+
+    def _release_cache(self):
+        """Vuelca la caché al terminar una búsqueda."""
+        if self._cache is not None:
+            self._cache.flush()
 
     def _on_clear(self):
+        self._log_queue.clear()
+        self.results_tree.delete(*self.results_tree.get_children())
         self.results_text.delete("1.0", "end")
         self.search_result = None
         self.save_btn.config(state="disabled")
@@ -134,16 +250,16 @@ class OSINTGUI(tk.Tk):
         
         # Usar fallback si sanitize_filename no está disponible
         base = sanitize_filename(self.search_result.get("query", "result"))
-        os.makedirs("results", exist_ok=True)
-        path = os.path.join("results", f"{base}_output.json")
+        path = os.path.join(RESULTS_DIR, f"{base}_output.json")
         
         try:
             if save_json:
                 save_json(self.search_result, path, ensure_ascii=False, indent=2)
             else:
                 # Fallback de guardado si save_json no está disponible
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump(self.search_result, f, ensure_ascii=False, indent=2, default=str)
+                data = json.dumps(self.search_result, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+                with open(path, "wb") as f:
+                    f.write(data)
             messagebox.showinfo("Guardado", f"Resultados guardados en:\n{path}")
         except Exception as e:
             messagebox.showerror("Error al guardar", str(e))
@@ -157,9 +273,30 @@ class OSINTGUI(tk.Tk):
         self.save_btn.config(state="disabled")
         self.progress.start(10)
         self.status_var.set("Ejecutando búsqueda...")
-        threading.Thread(target=self._run_search_thread, daemon=True).start()
+        # clics repetidos mientras hay una búsqueda pendiente se descartan
+        if self._jobs.empty():
+            self._jobs.put(None)
+
+    def _worker_loop(self):
+        """Hilo persistente: ejecuta una búsqueda por cada trabajo encolado."""
+        while True:
+            self._jobs.get()
+            try:
+                self._run_search_thread()
+            finally:
+                self._jobs.task_done()
+
+    def _finalize(self, msg: str, ok: bool, results=None):
+        """Restaura la UI al terminar una búsqueda (una sola llamada desde el hilo de trabajo)."""
+        self.progress.stop()
+        self.run_btn.config(state="normal")
+        self.save_btn.config(state="normal" if ok else "disabled")
+        self.status_var.set(msg)
+        if results is not None:
+            self._show_results(results)
 
     def _run_search_thread(self):
+        final_msg, ok, results = "Error", False, None
         try:
             q = self.query_var.get().strip()
             t = self.type_var.get()
@@ -167,28 +304,29 @@ class OSINTGUI(tk.Tk):
             delay = float(self.delay_var.get())
             use_cache = bool(self.use_cache_var.get())
             cache_file = self.cache_file_var.get().strip() or ".osint_cache.json"
+            workers = max(1, min(10, int(self.workers_var.get())))
 
             # Verificar módulos críticos
             if not SiteSearcher:
                 error_msg = "No se encontró SiteSearcher. Asegúrate de que core/site.py exista y esté correctamente implementado."
-                self.after(0, lambda: messagebox.showerror("Módulo faltante", error_msg))
-                self.after(0, lambda: self.status_var.set("Error de módulo"))
+                self.after(0, messagebox.showerror, "Módulo faltante", error_msg)
+                final_msg = "Error de módulo"
                 return
                 
             if t == "name" and not name_variants_improved:
                 error_msg = "No se encontró name_variants_improved. Asegúrate de que core/name_utils.py exista."
-                self.after(0, lambda: messagebox.showerror("Módulo faltante", error_msg))
-                self.after(0, lambda: self.status_var.set("Error de módulo"))
+                self.after(0, messagebox.showerror, "Módulo faltante", error_msg)
+                final_msg = "Error de módulo"
                 return
 
             # Configurar Cache
             cache = None
-            if use_cache and SimpleCache:
+            if use_cache and open_cache:
                 try:
-                    # TTL de 24 horas (86400 segundos)
-                    cache = SimpleCache(path=cache_file, ttl=86400)
+                    # TTL de 24 horas (86400 segundos); .sqlite usa SqliteCache
+                    cache = self._get_cache(cache_file)
                 except Exception as e:
-                    self.after(0, lambda: self._log(f"[!] Error inicializando caché: {e}"))
+                    self._log(f"[!] Error inicializando caché: {e}")
             
             # Configurar Rate Limiter
             limiter = None
@@ -196,7 +334,7 @@ class OSINTGUI(tk.Tk):
                 try:
                     limiter = DomainRateLimiter(min_delay=delay)
                 except Exception as e:
-                    self.after(0, lambda: self._log(f"[!] Error inicializando rate limiter: {e}"))
+                    self._log(f"[!] Error inicializando rate limiter: {e}")
 
             # Crear SiteSearcher SIN el parámetro limit (se pasa en unified_search)
             searcher = SiteSearcher(
@@ -209,15 +347,14 @@ class OSINTGUI(tk.Tk):
 
             queries = []
             if t == "name" and name_variants_improved:
-                variants = name_variants_improved(q)
                 max_queries = 4  # Límite razonable para no saturar
-                queries = variants[:max_queries]
-                if email_variants_from_name:
-                    email_sugs = email_variants_from_name(q, max_per_domain=2)[:max_queries]
-                    queries.extend(email_sugs)
-                self.after(0, lambda: self._log(f"[+] Variantes usadas: {', '.join(queries[:max_queries])}"))
+                queries = list(islice(name_variants_improved(q), max_queries))
+                email_sugs = (list(islice(email_variants_from_name(q, max_per_domain=2), max_queries))
+                              if email_variants_from_name else [])
+                queries.extend(email_sugs)
+                self._log("[+] Variantes usadas: ", queries[:max_queries])
                 if email_sugs:
-                    self.after(0, lambda: self._log(f"[+] Sugerencias de emails: {', '.join(email_sugs)}"))
+                    self._log("[+] Sugerencias de emails: ", email_sugs)
             else:
                 queries = [q]
 
@@ -231,64 +368,87 @@ class OSINTGUI(tk.Tk):
                 "names": set()
             }
 
-            for qi in queries:
-                if not qi.strip():
-                    continue
-                    
-                self.after(0, lambda qi=qi: self._log(f"Buscando: {qi}"))
-                try:
+            # Las consultas son I/O de red: se lanzan en paralelo (campo "Hilos").
+            # El DomainRateLimiter compartido sigue espaciando cada dominio.
+            # sin consultas vacías ni repetidas (ignorando mayúsculas)
+            seen_queries = set()
+            queries = [qi for qi in queries
+                       if qi.strip() and not (qi.lower() in seen_queries or seen_queries.add(qi.lower()))]
+            blocks = [None] * len(queries)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                for i, qi in enumerate(queries):
+                    self._log(f"Buscando: {qi}")
                     # Pasar el límite en unified_search, no en el constructor
-                    block = searcher.unified_search(
-                        qi, 
-                        limit=limit, 
-                        include_socials=True, 
+                    fut = executor.submit(
+                        searcher.unified_search,
+                        qi,
+                        limit=limit,
+                        include_socials=True,
                         include_repos=True
                     )
-                except Exception as exc:
-                    self.after(0, lambda qi=qi, exc=exc: self._log(f"Error buscando '{qi}': {exc}"))
-                    block = {"results": [], "entities": {}}
-                
+                    futures[fut] = i
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    try:
+                        block = fut.result()
+                    except Exception as exc:
+                        self._log(f"Error buscando '{queries[i]}': {exc}")
+                        block = {"results": [], "entities": {}}
+                    blocks[i] = block
+                    # mismo guard que al agregar: 'entities' puede venir como None
+                    ents = block.get("entities") or {}
+                    self._log(f"  -> {queries[i]}: enlaces: {len(block.get('results') or [])}  "
+                              f"emails encontrados en bloque: {len(ents.get('emails') or [])}")
+
+            # Agregar en el orden de las consultas para que la salida sea estable
+            seen_urls = set()
+            seen_add = seen_urls.add
+
+            def is_new(r):
+                # el mismo enlace suele volver en varias consultas
+                url = r.get("link") or r.get("url")
+                if not url:
+                    return True
+                if url in seen_urls:
+                    return False
+                seen_add(url)
+                return True
+
+            # métodos ligados una sola vez fuera del bucle
+            results_extend = all_results.extend
+            emails_update = aggregated_entities["emails"].update
+            phones_update = aggregated_entities["phones"].update
+            urls_update = aggregated_entities["urls"].update
+            usernames_update = aggregated_entities["usernames"].update
+            names_update = aggregated_entities["names"].update
+            socials_setdefault = aggregated_entities["socials"].setdefault
+
+            for block in blocks:
                 res = block.get("results", [])
-                ents = block.get("entities", {})
-
-                for r in res:
-                    all_results.append(r)
-                    
-                # Agregar entidades encontradas
-                for e in ents.get("emails", []):
-                    aggregated_entities["emails"].add(e)
-                for p in ents.get("phones", []):
-                    aggregated_entities["phones"].add(p)
-                for u in ents.get("links", []):  # Cambiado de "urls" a "links" según extractors.py
-                    aggregated_entities["urls"].add(u)
-                for u in ents.get("usernames", []):
-                    aggregated_entities["usernames"].add(u)
-                for n in ents.get("names", []):
-                    aggregated_entities["names"].add(n)
-                    
+                ents = block.get("entities", {}) or {}
+
+                results_extend(filter(is_new, res))
+
+                # Agregar entidades encontradas (set.update fusiona en C)
+                emails_update(ents.get("emails", ()))
+                phones_update(ents.get("phones", ()))
+                urls_update(ents.get("links", ()))  # "links" según extractors.py
+                usernames_update(ents.get("usernames", ()))
+                names_update(ents.get("names", ()))
+
                 # Procesar perfiles sociales correctamente
-                socials = ents.get("socials", {})
-                if socials:
-                    for platform, urls in socials.items():
-                        if platform not in aggregated_entities["socials"]:
-                            aggregated_entities["socials"][platform] = set()
-                        if isinstance(urls, list):
-                            for url in urls:
-                                aggregated_entities["socials"][platform].add(url)
-                        elif isinstance(urls, str):
-                            aggregated_entities["socials"][platform].add(urls)
-
-                self.after(0, lambda res=len(res), ents=len(ents.get('emails', [])), qi=qi: 
-                    self._log(f"  -> enlaces: {res}  emails encontrados en bloque: {ents}"))
-
-            # Convertir sets a listas para el resultado final
-            for key in ["emails", "phones", "urls", "usernames", "names"]:
-                aggregated_entities[key] = sorted(list(aggregated_entities[key]))
-                
-            # Procesar perfiles sociales
-            socials_result = {}
-            for platform, urls in aggregated_entities["socials"].items():
-                socials_result[platform] = sorted(list(urls))
+                for platform, urls in (ents.get("socials") or {}).items():
+                    platform_set = socials_setdefault(platform, set())
+                    if isinstance(urls, list):
+                        platform_set.update(urls)
+                    elif isinstance(urls, str):
+                        platform_set.add(urls)
+
+            # Convertir sets a listas ordenadas para el resultado final
+            socials_result = {p: sorted(u) for p, u in aggregated_entities["socials"].items()}
+            aggregated_entities = {k: sorted(v) if isinstance(v, set) else v
+                                   for k, v in aggregated_entities.items()}
 
             out = {
                 "query": q,
@@ -306,42 +466,43 @@ class OSINTGUI(tk.Tk):
             }
 
             self.search_result = out
-            os.makedirs("results", exist_ok=True)
+            results = all_results
             # Usar sanitize_filename con fallback
             base = sanitize_filename(q)
-            outpath = os.path.join("results", f"{base}_output.json")
+            outpath = os.path.join(RESULTS_DIR, f"{base}_output.json")
             
             try:
+                # Copia automática compacta (sin indentar): "Guardar JSON" la reescribe legible
                 if save_json:
-                    save_json(out, outpath, ensure_ascii=False, indent=2)
+                    save_json(out, outpath, ensure_ascii=False, indent=None)
                 else:
                     # Fallback de guardado si save_json no está disponible
-                    with open(outpath, "w", encoding="utf-8") as f:
-                        json.dump(out, f, ensure_ascii=False, indent=2, default=str)
-                self.after(0, lambda: self._log(f"[+] Resultados guardados en {outpath}"))
+                    data = json.dumps(out, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+                    with open(outpath, "wb") as f:
+                        f.write(data)
+                self._log(f"[+] Resultados guardados en {outpath}")
             except Exception as e:
-                self.after(0, lambda e=e: self._log(f"[!] Error guardando JSON: {e}"))
-
-            self.after(0, lambda: self._log("\n=== RESUMEN ==="))
-            self.after(0, lambda: self._log(f"Emails: {len(out['entities']['emails'])} -> {out['entities']['emails']}"))
-            self.after(0, lambda: self._log(f"Teléfonos: {len(out['entities']['phones'])} -> {out['entities']['phones']}"))
-            self.after(0, lambda: self._log(f"URLs: {len(out['entities']['urls'])}"))
-            self.after(0, lambda: self._log(f"Nombres detectados: {out['entities']['names']}"))
-            self.after(0, lambda: self._log(f"Nombres de usuario: {out['entities']['usernames']}"))
-            
-            social_summary = {k: len(v) for k, v in out['entities']['socials'].items()}
-            self.after(0, lambda: self._log(f"Perfiles detectados: {social_summary}"))
-
-            # Actualizar la UI desde el hilo secundario
-            self.after(0, lambda: self.save_btn.config(state="normal"))
-            self.after(0, lambda: self.status_var.set("Búsqueda completada"))
-        except Exception as e:
-            error_msg = f"Error inesperado:\n{traceback.format_exc()}"
-            self.after(0, lambda: self._log(error_msg))
-            self.after(0, lambda: self.status_var.set("Error"))
+                self._log(f"[!] Error guardando JSON: {e}")
+
+            ents_out = out["entities"]
+            social_summary = {k: len(v) for k, v in ents_out["socials"].items()}
+            self._log("\n".join([
+                "\n=== RESUMEN ===",
+                f"Emails: {len(ents_out['emails'])} -> {ents_out['emails']}",
+                f"Teléfonos: {len(ents_out['phones'])} -> {ents_out['phones']}",
+                f"URLs: {len(ents_out['urls'])}",
+                f"Nombres detectados: {ents_out['names']}",
+                f"Nombres de usuario: {ents_out['usernames']}",
+                f"Perfiles detectados: {social_summary}",
+            ]))
+
+            final_msg, ok = "Búsqueda completada", True
+        except Exception:
+            self._log(f"Error inesperado:\n{traceback.format_exc()}")
         finally:
-            self.after(0, lambda: self.progress.stop())
-            self.after(0, lambda: self.run_btn.config(state="normal"))
+            self._release_cache()
+            # Actualizar la UI desde el hilo secundario: un único evento
+            self.after(0, self._finalize, final_msg, ok, results)
 
 def run_app():
     app = OSINTGUI()
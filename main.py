@@ -11,151 +11,479 @@ Estructura esperada:
   │  ├─ site.py          (SiteSearcher)
   │  ├─ name_utils.py    (name_variants_improved, email_variants_from_name)
   │  ├─ extractors.py    (extract_all o extract_entities)
-  │  └─ utils.py         (SimpleCache, DomainRateLimiter, save_json, save_dicts_to_csv opcionales)
+  │  └─ utils.py         (SimpleCache, DomainRateLimiter, atomic_write_bytes, save_dicts_to_csv opcionales)
   ├─ data/
   └─ results/
 """
 from __future__ import annotations
 import argparse
+import asyncio
+import csv
+import importlib
+import importlib.util
 import json
 import os
+import re
 import sys
-from pprint import pprint
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain, zip_longest
+from operator import attrgetter
 from typing import Optional, List, Dict
+from urllib.parse import urlsplit, urlunsplit
+
+# orjson (opcional): serializa la salida --json varias veces más rápido
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -------------------------
 # Intentar importar módulos core
 # -------------------------
 MISSING = []
-try:
-    from core import site as core_site
-except Exception:
-    core_site = None
-    MISSING.append("core.site")
 
-try:
-    from core import name_utils
-except Exception:
-    name_utils = None
-    MISSING.append("core.name_utils")
+@lru_cache(maxsize=None)
+def _get_module(name: str):
+    """
+    Importa core.<name> la primera vez que se pide (None si no existe).
+    find_spec solo comprueba que el archivo esté: un error real dentro del
+    módulo (sintaxis, dependencia rota) se propaga en vez de pasar por
+    "módulo faltante".
+    """
+    try:
+        found = importlib.util.find_spec(f"core.{name}") is not None
+    except ModuleNotFoundError:
+        # no existe ni el paquete core
+        found = False
+    if not found:
+        if f"core.{name}" not in MISSING:
+            MISSING.append(f"core.{name}")
+        return None
+    return importlib.import_module(f"core.{name}")
 
-try:
-    from core import extractors
-except Exception:
-    extractors = None
-    MISSING.append("core.extractors")
+# core.site y core.utils traen requests y bs4 (la mayor parte del arranque):
+# se cargan en _load_core() al empezar una búsqueda, no al importar main,
+# así --help y --gui no los pagan. Hasta entonces, los fallbacks locales.
+core_site = extractors = core_utils = None
+SimpleCache = open_cache = DomainRateLimiter = None
+SiteSearcher = None
+extract_all = extract_entities = None
+save_dicts_to_csv = sanitize_filename = atomic_write_bytes = None
 
-try:
-    from core import utils as core_utils
-except Exception:
-    core_utils = None
-    MISSING.append("core.utils")
+@lru_cache(maxsize=4096)
+def _domain_of(url: str) -> str:
+    try:
+        return urlsplit(url).netloc.lower()
+    except ValueError:
+        return ""
 
-# Si faltan módulos críticos, informamos pero permitimos ver mensaje de ayuda
-if MISSING:
-    print(">>> Advertencia: faltan módulos en `core`:", ", ".join(MISSING))
-    print("Asegúrate de tener los archivos en core/: site.py, name_utils.py, extractors.py, utils.py (opcional).")
-    # no salimos automáticamente; dejamos que el CLI indique error si se intenta buscar
+domain_of = _domain_of
 
-# -------------------------
-# Fallbacks y helpers locales
-# -------------------------
-# Fallback cache / limiter
-SimpleCache = getattr(core_utils, "SimpleCache", None) if core_utils else None
-DomainRateLimiter = getattr(core_utils, "DomainRateLimiter", None) if core_utils else None
+@lru_cache(maxsize=None)
+def _load_core() -> None:
+    """
+    Importa los módulos core (una sola vez) y enlaza sus helpers en los
+    globales del módulo en lugar de los fallbacks locales.
+    """
+    global core_site, extractors, core_utils, SimpleCache, open_cache, DomainRateLimiter
+    global SiteSearcher, extract_all, extract_entities, save_dicts_to_csv, sanitize_filename
+    global atomic_write_bytes, domain_of, classify_url, score_hit
+    core_site = _get_module("site")
+    extractors = _get_module("extractors")
+    core_utils = _get_module("utils")
+    # se sondea ya (es ligero) para que el aviso de abajo la incluya si falta
+    _get_module("name_utils")
+
+    # Si faltan módulos críticos, informamos una sola vez; el CLI indica el error al buscar
+    if MISSING:
+        print(">>> Advertencia: faltan módulos en `core`:", ", ".join(MISSING))
+        print("Asegúrate de tener los archivos en core/: site.py, name_utils.py, extractors.py, utils.py (opcional).")
+
+    # Fallback cache / limiter
+    SimpleCache = getattr(core_utils, "SimpleCache", None) if core_utils else None
+    open_cache = getattr(core_utils, "open_cache", SimpleCache) if core_utils else None
+    DomainRateLimiter = getattr(core_utils, "DomainRateLimiter", None) if core_utils else None
+
+    # Try to use SiteSearcher if available
+    SiteSearcher = getattr(core_site, "SiteSearcher", None) if core_site else None
 
-# Try to use SiteSearcher if available
-SiteSearcher = getattr(core_site, "SiteSearcher", None) if core_site else None
+    # Extractors
+    extract_all = getattr(extractors, "extract_all", None) if extractors else None
+    extract_entities = getattr(extractors, "extract_entities", None) if extractors else None
 
-# Extractors
-extract_all = getattr(extractors, "extract_all", None) if extractors else None
-extract_entities = getattr(extractors, "extract_entities", None) if extractors else None
+    # utils export helpers (optional)
+    atomic_write_bytes = getattr(core_utils, "atomic_write_bytes", None) if core_utils else None
+    save_dicts_to_csv = getattr(core_utils, "save_dicts_to_csv", None) if core_utils else None
+    sanitize_filename = getattr(core_utils, "sanitize_filename", None) if core_utils else None
+    # memoizada en core.utils: cada URL se parsea una sola vez en todo el proceso
+    domain_of = getattr(core_utils, "domain_of", _domain_of) if core_utils else _domain_of
 
-# utils export helpers (optional)
-save_json = getattr(core_utils, "save_json", None) if core_utils else None
-save_dicts_to_csv = getattr(core_utils, "save_dicts_to_csv", None) if core_utils else None
-sanitize_filename = getattr(core_utils, "sanitize_filename", None) if core_utils else None
+    # if core_utils defines helpers, prefer them (se comprueba una sola vez aquí, no en cada hit)
+    classify_url = getattr(core_utils, "classify_url", None) if core_utils else None
+    score_hit = getattr(core_utils, "score_hit", None) if core_utils else None
+    if not callable(classify_url):
+        classify_url = classifier.classify
+    if not callable(score_hit):
+        score_hit = classifier.score
+
+def default_cache_path() -> str:
+    """
+    Caché por defecto: SQLite (escrituras por fila, segura con búsquedas
+    concurrentes), salvo que ya exista la caché JSON de versiones anteriores.
+    """
+    if os.path.exists(".osint_cache.json") or not hasattr(core_utils, "SqliteCache"):
+        return ".osint_cache.json"
+    return ".osint_cache.sqlite"
+
+def _json_default(obj):
+    """
+    Tipos que json no conoce, uno a uno (orjson ya trae dataclasses y fechas).
+    Cualquier otro es un error: mejor un TypeError que un str() que no se
+    puede volver a leer.
+    """
+    as_dict = getattr(obj, "as_dict", None)
+    if as_dict is not None:
+        # Hit se exporta como su dict
+        return as_dict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+def _dumps_pretty(obj) -> bytes:
+    """JSON indentado en bytes UTF-8; orjson si está instalado, json estándar si no."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                                default=_json_default)
+        except TypeError:
+            # p. ej. surrogates sueltos: json estándar los escapa
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8", "backslashreplace")
+
+def _append_raw_blocks(head: bytes, raw_blocks) -> bytes:
+    """
+    Añade la clave "raw_blocks" a un objeto ya serializado con _dumps_pretty,
+    con el mismo resultado que serializar el objeto completo. Las cadenas
+    JSON no llevan saltos de línea literales, así que reindentar un nivel es
+    un replace. 'head' debe ser un objeto no vacío.
+    """
+    raw = _dumps_pretty(raw_blocks).replace(b"\n", b"\n  ")
+    return head[:-2] + b',\n  "raw_blocks": ' + raw + b"\n}"
 
 def ensure_results_dir(path: str = "results"):
     os.makedirs(path, exist_ok=True)
     return path
 
+def _load_fresh_results(path: str, max_age: float) -> Optional[Dict]:
+    """JSON de resultados en 'path' si existe y tiene menos de max_age segundos; si no, None."""
+    try:
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        obj = orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError):
+        return None
+    return obj if isinstance(obj, dict) else None
+
+# -------------------------
+# Variantes de nombre (cacheadas)
+# -------------------------
+@dataclass(frozen=True)
+class NameVariants:
+    """Variantes de un nombre ya separadas en frases (con espacio) y usernames."""
+    space: tuple
+    uname: tuple
+
+    @property
+    def total(self) -> int:
+        return len(self.space) + len(self.uname)
+
+@lru_cache(maxsize=128)
+def _cached_variants(name: str) -> NameVariants:
+    """Genera y particiona las variantes una sola vez por nombre."""
+    name_utils = _get_module("name_utils")
+    if hasattr(name_utils, "name_variants_improved"):
+        name_vars = name_utils.name_variants_improved(name)
+    else:
+        name_vars = [name]
+    space, uname = [], []
+    for v in name_vars:
+        (space if " " in v else uname).append(v)
+    return NameVariants(tuple(space), tuple(uname))
+
+# -------------------------
+# Construcción de queries
+# -------------------------
+# partes locales de correo tan comunes que buscarlas solas solo trae ruido
+_COMMON_LOCALPARTS = frozenset({
+    "info", "admin", "contact", "contacto", "hola", "hello", "mail", "email",
+    "ventas", "sales", "support", "soporte", "office", "test", "user", "webmaster",
+})
+
+def build_queries(args) -> tuple:
+    """
+    Devuelve (query_type, query_value, queries) según --name/--email/--phone,
+    con las queries sin vacíos ni repetidas. Sin argumento de búsqueda
+    devuelve (None, None, []).
+    - name: alterna variantes con espacio y usernames para que, si se
+      recortan, ambas formas queden cubiertas; después, sugerencias de correo
+    - email: el correo, la parte local (si no es corta ni genérica) y el
+      correo entre comillas (si la parte local no es demasiado corta)
+    """
+    if args.name:
+        query_type = "name"
+        query_value = args.name.strip()
+        name_utils = _get_module("name_utils")
+        nv = _cached_variants(query_value)
+        # limitar queries: priorizar variantes con espacios y usernames
+        maxq = max(1, min(args.max_name_queries, nv.total))
+        pairs = zip_longest(nv.space[:maxq], nv.uname[:maxq])
+        emails = ()
+        if hasattr(name_utils, "email_variants_from_name"):
+            # limit: solo se generan los maxq correos que se van a usar
+            emails = name_utils.email_variants_from_name(query_value, domain_hints=None,
+                                                         max_per_domain=3, limit=maxq)
+        # los None del relleno de zip_longest caen en el filtro final
+        queries = chain(chain.from_iterable(pairs), emails)
+    elif args.email:
+        query_type = "email"
+        query_value = args.email.strip()
+        local = query_value.split("@")[0]
+        queries = [query_value]
+        if len(local) >= 4 and local.lower() not in _COMMON_LOCALPARTS:
+            queries.append(local)
+        if len(local) >= 4:
+            queries.append(f'"{query_value}"')
+    elif args.phone:
+        query_type = "phone"
+        query_value = args.phone.strip()
+        queries = [query_value]
+    else:
+        return None, None, []
+    return query_type, query_value, list(dict.fromkeys(q for q in queries if q))
+
 # -------------------------
 # Consolidación simple
 # -------------------------
+# slots=True existe desde Python 3.10; en versiones anteriores, dataclass normal
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
+class Hit:
+    """
+    Resultado consolidado. Con __slots__ ocupa bastante menos que un dict y
+    el scoring usa acceso por atributo; se pasa a dict solo al exportar.
+    """
+    engine: Optional[str]
+    title: Optional[str]
+    link: Optional[str]
+    snippet: Optional[str]
+    raw: str = ""
+    category: str = ""
+    score: int = 0
+
+    def as_dict(self) -> Dict:
+        # mismo orden de claves que los dicts que se exportaban antes
+        return {"engine": self.engine, "title": self.title, "link": self.link,
+                "snippet": self.snippet, "raw": self.raw,
+                "category": self.category, "score": self.score}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Hit":
+        """Inverso de as_dict (p. ej. al releer un JSON de resultados)."""
+        return cls(d.get("engine"), d.get("title"), d.get("link"), d.get("snippet"),
+                   d.get("raw") or "", d.get("category") or "", d.get("score") or 0)
+
+def _canon_url(url: str) -> str:
+    """
+    Clave de deduplicación de un enlace: esquema y host en minúsculas,
+    sin fragmento ni "/" final (la ruta y la query se conservan tal cual).
+    """
+    try:
+        u = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((u.scheme.lower(), u.netloc.lower(), u.path.rstrip("/"), u.query, ""))
+
 def consolidate_blocks(blocks: List[Dict]) -> Dict:
-    emails = set()
-    phones = set()
-    urls = set()
-    socials = {}
+    ents_list = [b.get("entities") or {} for b in blocks]
+    # dict.fromkeys en vez de sets: deduplica igual pero conserva el orden de
+    # aparición (el ranking de los motores); chain recorre todo en C
+    emails = dict.fromkeys(chain.from_iterable(e.get("emails") or () for e in ents_list))
+    phones = dict.fromkeys(chain.from_iterable(e.get("phones") or () for e in ents_list))
+    # SiteSearcher entrega las URLs como "links"; otros bloques como "urls"
+    urls = dict.fromkeys(chain.from_iterable(e.get("urls") or e.get("links") or () for e in ents_list))
+    domain_counts = Counter(map(domain_of, urls))
+    socials = defaultdict(set)
+    for sn, vals in chain.from_iterable((e.get("socials") or {}).items() for e in ents_list):
+        socials[sn].update(vals if isinstance(vals, list) else [vals])
     hits = []
+    # enlace canónico -> hit ya agregado (el mismo resultado vuelve por varios motores/queries)
+    seen_hits: Dict[str, Hit] = {}
 
     for b in blocks:
-        ents = b.get("entities", {}) or {}
-        for e in ents.get("emails", []) or []:
-            emails.add(e)
-        for p in ents.get("phones", []) or []:
-            phones.add(p)
-        for u in ents.get("urls", []) or []:
-            urls.add(u)
-        for sn, vals in (ents.get("socials") or {}).items():
-            socials.setdefault(sn, set()).update(vals if isinstance(vals, list) else [vals])
         for s in (b.get("results") or b.get("sources") or []):
             if not isinstance(s, dict):
                 continue
-            hits.append({
-                "engine": s.get("engine"),
-                "title": s.get("title"),
-                "link": s.get("link"),
-                "snippet": s.get("snippet"),
-                "raw": s.get("raw") or ""
-            })
-
-    socials = {k: sorted(list(v)) for k, v in socials.items()}
+            link = s.get("link")
+            raw = s.get("raw") or ""
+            key = _canon_url(link) if link else None
+            prev = seen_hits.get(key) if key else None
+            if prev is not None:
+                # conservar el primero (mejor posición en el ranking) y sumarle
+                # lo que aporte el repetido: raw para el scoring, snippet y título
+                if raw and raw not in prev.raw:
+                    prev.raw = f"{prev.raw} {raw}" if prev.raw else raw
+                snippet = s.get("snippet")
+                if snippet and snippet not in (prev.snippet or ""):
+                    prev.snippet = f"{prev.snippet} | {snippet}" if prev.snippet else snippet
+                if not prev.title:
+                    prev.title = s.get("title")
+                continue
+            hit = Hit(s.get("engine"), s.get("title"), link, s.get("snippet"), raw)
+            if key:
+                seen_hits[key] = hit
+            hits.append(hit)
+
+    socials = {k: sorted(v) for k, v in socials.items()}
     return {
-        "emails": sorted(emails),
-        "phones": sorted(phones),
-        "urls": sorted(urls),
+        "emails": list(emails),
+        "phones": list(phones),
+        "urls": list(urls),
         "socials": socials,
+        "domain_counts": domain_counts,
         "hits": hits
     }
 
+def compact_blocks(blocks: List[Dict]) -> List[Dict]:
+    """
+    Copia de los bloques para raw_blocks sin lo que ya está en "hits": de cada
+    resultado quedan engine y link (título, snippet y raw van en el hit de
+    ese link). Los bloques originales no se modifican.
+    """
+    compact = []
+    for b in blocks:
+        b = dict(b)
+        b["results"] = [{"engine": r.get("engine"), "link": r.get("link")}
+                        for r in (b.get("results") or []) if isinstance(r, dict)]
+        compact.append(b)
+    return compact
+
 # -------------------------
 # Scoring & classification (opcional con core.utils)
 # -------------------------
+# (subcadena, categoría) en orden de prioridad
+_RULES = (
+    ("instagram.com", "instagram"),
+    ("twitter.com", "twitter"),
+    ("x.com", "twitter"),
+    ("tiktok.com", "tiktok"),
+    ("github.com", "github"),
+    ("pastebin.com", "pastebin"),
+    ("mediafire.com", "mediafire"),
+)
+
+_RULE_TAGS = dict(_RULES)
+_RULE_RANK = {needle: i for i, (needle, _) in enumerate(_RULES)}
+# todas las reglas en un solo patrón: una pasada en C por URL. El lookbehind
+# exige que el dominio empiece en un límite ("www.x.com" sí, "dropbox.com" no)
+_CLASSIFY_RE = re.compile(
+    r"(?<![\w-])(" + "|".join(re.escape(needle) for needle, _ in _RULES) + r")",
+    re.IGNORECASE,
+)
+
+@lru_cache(maxsize=4096)
+def _classify_cached(url: str) -> str:
+    # el mismo perfil suele volver por varios motores: una búsqueda en el dict.
+    # La alternancia devuelve la coincidencia más a la izquierda, no la regla
+    # de más prioridad: se recorren todas y gana la de menor índice en _RULES
+    best = min((m.group(1).lower() for m in _CLASSIFY_RE.finditer(url)),
+               key=_RULE_RANK.__getitem__, default=None)
+    return _RULE_TAGS[best] if best else "website"
+
 class SimpleClassifier:
     @staticmethod
     def classify(url: str) -> str:
         if not url:
             return "unknown"
-        u = url.lower()
-        if "instagram.com" in u: return "instagram"
-        if "twitter.com" in u or "x.com" in u: return "twitter"
-        if "tiktok.com" in u: return "tiktok"
-        if "github.com" in u: return "github"
-        if "pastebin.com" in u: return "pastebin"
-        if "mediafire.com" in u: return "mediafire"
-        return "website"
+        return _classify_cached(url)
 
     @staticmethod
     def score(raw: str, q: str, url: Optional[str]=None) -> int:
+        # cada cadena se pasa a minúsculas una sola vez
+        raw = (raw or "").lower()
+        needle = (q or "").lower().strip('"')
         s = 0
-        if q and q.lower().strip('"') in (raw or "").lower(): s += 3
-        if url and q.lower().strip('"') in (url or "").lower(): s += 4
-        if "error" in (raw or "").lower(): s -= 2
+        if q and needle in raw: s += 3
+        if url and needle in url.lower(): s += 4
+        if "error" in raw: s -= 2
         return s
 
 classifier = SimpleClassifier()
-# if core_utils defines helpers, prefer them
-classify_url = getattr(core_utils, "classify_url", classifier.classify) if core_utils else classifier.classify
-score_hit = getattr(core_utils, "score_hit", classifier.score) if core_utils else classifier.score
+# _load_core() los reemplaza por los de core.utils si los define
+classify_url = classifier.classify
+score_hit = classifier.score
 
-def score_hits(hits: List[Dict], query_main: str) -> List[Dict]:
-    for h in hits:
-        h["category"] = classify_url(h.get("link"))
-        h["score"] = score_hit(h.get("raw",""), query_main, h.get("link"))
-    hits_sorted = sorted(hits, key=lambda x: x.get("score", 0), reverse=True)
-    return hits_sorted
+_by_score = attrgetter("score")
+# hits que se muestran en summary["top_hits"]
+TOP_HITS = 50
+
+def score_hits(hits: List[Hit], query_main: str) -> List[Hit]:
+    """
+    Clasifica y puntúa los hits y los devuelve de mayor a menor score
+    (la lista se ordena completa en su sitio: el JSON guarda todos los hits).
+    """
+    # globales del módulo ligadas a locales fuera del bucle
+    classify = classify_url
+    score = score_hit
+    if score is classifier.score:
+        # mismo cálculo que SimpleClassifier.score, pero la consulta se
+        # normaliza una sola vez para todo el lote y no una vez por hit.
+        # Son búsquedas de subcadenas sobre str (el 'in' ya corre en C): un JIT
+        # numérico tipo numba no aporta aquí, y pasarlo a arrays es más lento
+        needle = (query_main or "").lower().strip('"')
+        for h in hits:
+            link = h.link
+            raw = h.raw.lower()
+            s = 0
+            if query_main and needle in raw: s += 3
+            if link and needle in link.lower(): s += 4
+            if "error" in raw: s -= 2
+            h.category = classify(link)
+            h.score = s
+    else:
+        for h in hits:
+            link = h.link
+            h.category = classify(link)
+            h.score = score(h.raw, query_main, link)
+    hits.sort(key=_by_score, reverse=True)
+    return hits
+
+# -------------------------
+# Búsquedas concurrentes
+# -------------------------
+async def search_queries(searcher, queries: List[str], limit: int = 6, workers: int = 4) -> List[Dict]:
+    """
+    Lanza todas las queries con searcher.batch_search en un hilo aparte
+    (SiteSearcher es síncrono). batch_search es quien reparte las búsquedas
+    entre hasta 'workers' hilos y extrae las entidades de todos los bloques
+    juntas al final. Los bloques se devuelven en el mismo orden que 'queries'.
+    """
+    for q in queries:
+        print(f"  -> Query: {q}")
+    blocks = await asyncio.to_thread(searcher.batch_search, queries, limit=limit, workers=workers)
+    for q, block in zip(queries, blocks):
+        block.setdefault("query", q)
+    return blocks
 
 # -------------------------
 # Orquestador principal
@@ -177,103 +505,119 @@ def run_orchestrator(args):
             print("No se pudo iniciar GUI:", e)
             print("Continuando en modo CLI...")
 
+    return asyncio.run(run_orchestrator_async(args))
+
+async def run_orchestrator_async(args):
+    """
+    Modo CLI: construye las queries, las lanza en paralelo (search_queries),
+    consolida, puntúa y exporta. run_orchestrator la ejecuta con asyncio.run;
+    quien ya tenga un event loop puede esperarla directamente.
+    """
+    _load_core()
     # verificar módulos requeridos
     if not SiteSearcher:
         print("Error: core.site.SiteSearcher no está disponible. Crea core/site.py con SiteSearcher.")
         sys.exit(1)
-    if not name_utils:
+    if args.name and not _get_module("name_utils"):
         print("Error: core.name_utils no está disponible. Crea core/name_utils.py.")
         sys.exit(1)
     if not (extract_all or extract_entities):
         print("Aviso: core.extractors no está disponible. La extracción de entidades será limitada.")
 
+    # construir queries según tipo
+    query_type, query_value, queries = build_queries(args)
+    if query_type is None:
+        print("No hay argumento de búsqueda. Usa --name, --email o --phone.")
+        sys.exit(1)
+
+    # nombre de archivo de esta consulta: se limpia una vez y se reutiliza
+    safe_name = sanitize_filename(query_value) if sanitize_filename else query_value.replace(" ", "_")
+    out_path = os.path.join("results", safe_name + ".json")
+    if args.skip_if_exists:
+        previous = _load_fresh_results(out_path, args.cache_ttl)
+        if previous is not None:
+            # mismo tipo de retorno que una ejecución normal: hits como Hit
+            previous["hits"] = [Hit.from_dict(h) for h in previous.get("hits") or () if isinstance(h, dict)]
+            summary = previous.get("summary")
+            if isinstance(summary, dict) and "top_hits" in summary:
+                summary["top_hits"] = [Hit.from_dict(h) for h in summary["top_hits"] or () if isinstance(h, dict)]
+            print(f"[+] {out_path} es reciente (menos de {args.cache_ttl}s): no se repiten las búsquedas")
+            if args.json:
+                printed = previous if args.include_raw else {k: v for k, v in previous.items() if k != "raw_blocks"}
+                sys.stdout.flush()
+                sys.stdout.buffer.write(_dumps_pretty(printed) + b"\n")
+                sys.stdout.buffer.flush()
+            return previous
+
+    print(f"[+] Ejecutando búsquedas para {len(queries)} queries (tipo={query_type})")
+
+    # límite de conexiones simultáneas por host (pool HTTP compartido)
+    set_connection_limits = getattr(core_utils, "set_connection_limits", None) if core_utils else None
+    if set_connection_limits:
+        set_connection_limits(per_host=args.max_conns_per_host)
+
     # preparar cache y limiter si están disponibles
     cache = None
-    if SimpleCache:
+    if open_cache:
         try:
-            cache = SimpleCache(path=args.cache, ttl=args.cache_ttl)
+            cache = open_cache(path=args.cache or default_cache_path(), ttl=args.cache_ttl)
         except Exception:
             cache = None
     limiter = None
     if DomainRateLimiter:
         try:
-            limiter = DomainRateLimiter(min_delay=args.mindelay)
+            # --rps-per-host es otra forma de dar --mindelay (1 / rps)
+            min_delay = 1.0 / args.rps_per_host if args.rps_per_host else args.mindelay
+            limiter = DomainRateLimiter(min_delay=min_delay, rps=args.rps)
         except Exception:
             limiter = None
 
+    # una sesión (pool keep-alive + reintentos) para todas las queries de esta ejecución
+    build_session = getattr(core_utils, "build_session", None) if core_utils else None
+    session = build_session() if build_session else None
+
     # crear SiteSearcher (usa cache y limiter si el constructor lo acepta)
     try:
         searcher = SiteSearcher(client_headers=getattr(core_utils, "HEADERS", None) if core_utils else None,
                                 timeout=getattr(core_utils, "TIMEOUT", 12) if core_utils else 12,
                                 proxy=args.proxy,
                                 limiter=limiter,
-                                cache=cache)
+                                cache=cache,
+                                session=session)
     except Exception as e:
         print("Error instanciando SiteSearcher:", e)
         searcher = None
 
-    # construir queries según tipo
-    queries = []
-    query_type = None
-    query_value = None
-    if args.name:
-        query_type = "name"
-        query_value = args.name.strip()
-        name_vars = name_utils.name_variants_improved(query_value) if hasattr(name_utils, "name_variants_improved") else [query_value]
-        # limitar queries: priorizar variantes con espacios y usernames
-        maxq = max(1, min(args.max_name_queries, len(name_vars)))
-        space_vars = [v for v in name_vars if " " in v][:maxq]
-        uname_vars = [v for v in name_vars if " " not in v][:maxq]
-        email_sugs = []
-        if hasattr(name_utils, "email_variants_from_name"):
-            email_sugs = name_utils.email_variants_from_name(query_value, domain_hints=None, max_per_domain=3)[:maxq]
-        queries = space_vars + uname_vars + email_sugs
-    elif args.email:
-        query_type = "email"
-        query_value = args.email.strip()
-        queries = [query_value, query_value.split("@")[0], f'"{query_value}"']
-    elif args.phone:
-        query_type = "phone"
-        query_value = args.phone.strip()
-        queries = [query_value]
-    else:
-        print("No hay argumento de búsqueda. Usa --name, --email o --phone.")
-        sys.exit(1)
 
-    queries = list(dict.fromkeys(q for q in queries if q))
-    print(f"[+] Ejecutando búsquedas para {len(queries)} queries (tipo={query_type})")
-
-    # ejecutar búsquedas
+    # ejecutar búsquedas (en paralelo, como máximo --workers a la vez)
     blocks = []
-    for q in queries:
-        print(f"  -> Query: {q}")
-        try:
-            if searcher:
-                block = searcher.unified_search(q, limit=args.limit, include_socials=True, include_repos=True)
-                # expected block: {"results": [...], "entities": {...}}
-                # adaptamos a formato consistente: 'results' y 'entities'
-                if not isinstance(block, dict):
-                    block = {"query": q, "results": [], "entities": {}}
-                block.setdefault("query", q)
-                blocks.append(block)
-            else:
-                print("  ! No hay searcher válido, saltando query.")
-        except Exception as e:
-            print("  ! Error en query:", e)
-            blocks.append({"query": q, "results": [], "entities": {}, "error": str(e)})
+    try:
+        if searcher:
+            blocks = await search_queries(searcher, queries, limit=args.limit, workers=args.workers)
+        else:
+            print("  ! No hay searcher válido, saltando queries.")
+    finally:
+        if session is not None:
+            session.close()
 
     # consolidar entidades
     consolidated = consolidate_blocks(blocks)
     hits = consolidated.get("hits", [])
+    # el JSON de resultados guarda todos los hits ordenados, así que aquí se
+    # ordena la lista completa una sola vez; top_hits es un corte de esa misma
+    # lista (un heapq.nlargest aparte sería una segunda pasada, no un ahorro)
+    # se quedan como Hit: los serializadores los pasan a dict al escribir
     hits_scored = score_hits(hits, query_value)
     summary = {
         "query_type": query_type,
         "query_value": query_value,
+        "safe_name": safe_name,
         "emails_found": consolidated.get("emails", []),
         "phones_found": consolidated.get("phones", []),
         "urls_found": consolidated.get("urls", []),
         "socials_found": consolidated.get("socials", {}),
-        "top_hits": hits_scored[:50]
+        "top_domains": consolidated["domain_counts"].most_common(20),
+        "top_hits": hits_scored[:TOP_HITS]
     }
 
     # exportar JSON
@@ -283,13 +627,17 @@ def run_orchestrator(args):
         "hits": hits_scored,
         "raw_blocks": blocks
     }
-    out_path = os.path.join("results", (sanitize_filename(query_value) if sanitize_filename else (query_value.replace(" ", "_")) ) + ".json")
+    # summary+hits se serializan una sola vez: --json los imprime tal cual y el
+    # archivo añade raw_blocks al final
+    head = _dumps_pretty({"summary": summary, "hits": hits_scored})
+    blob = _append_raw_blocks(head, blocks if args.keep_raw else compact_blocks(blocks))
     try:
-        if save_json:
-            save_json(out_obj, out_path, ensure_ascii=False, indent=2)
+        if atomic_write_bytes:
+            # temporal + fsync + os.replace: un Ctrl+C a mitad no deja el JSON cortado
+            atomic_write_bytes(out_path, blob, durable=True)
         else:
-            with open(out_path, "w", encoding="utf-8") as f:
-                json.dump(out_obj, f, ensure_ascii=False, indent=2, default=str)
+            with open(out_path, "wb") as f:
+                f.write(blob)
         print(f"[+] Resultado guardado en {out_path}")
     except Exception as e:
         print("Error guardando JSON:", e)
@@ -301,44 +649,39 @@ def run_orchestrator(args):
         try:
             # try using core.utils helper
             if save_dicts_to_csv:
-                # hits -> csv
+                # hits -> csv (save_dicts_to_csv toma solo las columnas pedidas)
                 csv_hits = base + "_hits.csv"
                 fieldnames = ["engine", "title", "link", "snippet", "score", "category"]
-                dicts = []
-                for h in hits_scored:
-                    dicts.append({
-                        "engine": h.get("engine"),
-                        "title": h.get("title"),
-                        "link": h.get("link"),
-                        "snippet": h.get("snippet"),
-                        "score": h.get("score"),
-                        "category": h.get("category")
-                    })
-                save_dicts_to_csv(csv_hits, fieldnames, dicts)
+                save_dicts_to_csv(csv_hits, fieldnames, (h.as_dict() for h in hits_scored))
                 exported.append(csv_hits)
-                # emails/socials
+                # emails/socials (csv.writer se encarga de comillas y comas)
                 csv_es = base + "_emails_socials.csv"
-                with open(csv_es, "w", encoding="utf-8") as f:
-                    f.write("emails\n")
-                    for e in consolidated.get("emails", []):
-                        f.write(e + "\n")
-                    f.write("\nsocial,users\n")
-                    for k, v in consolidated.get("socials", {}).items():
-                        f.write(f"{k},{';'.join(v)}\n")
+                with open(csv_es, "w", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f)
+                    w.writerow(["emails"])
+                    w.writerows([e] for e in consolidated.get("emails", []))
+                    w.writerow([])
+                    w.writerow(["social", "users"])
+                    w.writerows((k, ";".join(v)) for k, v in consolidated.get("socials", {}).items())
                 exported.append(csv_es)
             else:
                 # simple fallback
                 p1 = base + "_summary.csv"
-                with open(p1, "w", encoding="utf-8") as f:
-                    f.write("query_type,query_value,emails_count,phones_count,urls_count\n")
-                    f.write(f"{summary['query_type']},{summary['query_value']},{len(summary['emails_found'])},{len(summary['phones_found'])},{len(summary['urls_found'])}\n")
+                with open(p1, "w", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f)
+                    w.writerow(["query_type", "query_value", "emails_count", "phones_count", "urls_count"])
+                    w.writerow([summary["query_type"], summary["query_value"], len(summary["emails_found"]),
+                                len(summary["phones_found"]), len(summary["urls_found"])])
                 exported.append(p1)
         except Exception as e:
             print("Error exportando CSVs:", e)
 
     # output en pantalla
     if args.json:
-        print(json.dumps(out_obj, ensure_ascii=False, indent=2, default=str))
+        # raw_blocks repite todo lo demás: solo se imprime con --include-raw
+        sys.stdout.flush()
+        sys.stdout.buffer.write((blob if args.include_raw else head) + b"\n")
+        sys.stdout.buffer.flush()
     else:
         print("\n=== RESUMEN ===")
         print(f"Tipo: {summary.get('query_type')} | Consulta: {summary.get('query_value')}")
@@ -365,13 +708,22 @@ def parse_args():
     group.add_argument("--name", "-n", help="Nombre completo a investigar")
     p.add_argument("--gui", action="store_true", help="Iniciar GUI (si existe gui.py con run_app())")
     p.add_argument("--json", action="store_true", help="Imprimir JSON completo en salida estándar")
+    p.add_argument("--include-raw", action="store_true", help="Incluir raw_blocks en la salida --json")
+    p.add_argument("--keep-raw", action="store_true",
+                   help="Guardar raw_blocks completos (por defecto solo engine y link de cada resultado)")
     p.add_argument("--limit", type=int, default=6, help="Límite por motor")
-    p.add_argument("--workers", type=int, default=4, help="Hilos (si implementado)")
+    p.add_argument("--workers", type=int, default=4, help="Queries simultáneas")
+    p.add_argument("--max-conns-per-host", type=int, default=6, help="Conexiones simultáneas máximas por host")
     p.add_argument("--mindelay", type=float, default=1.5, help="Delay mínimo por dominio")
+    p.add_argument("--rps", type=float, default=None, help="Máx peticiones por segundo en total (opcional)")
+    p.add_argument("--rps-per-host", type=float, default=None, help="Máx peticiones por segundo por dominio (reemplaza --mindelay)")
     p.add_argument("--proxy", type=str, default=None, help="Proxy HTTP/HTTPS (opcional)")
     p.add_argument("--out", type=str, default=None, help="Base name para export CSV (ej: report)")
-    p.add_argument("--cache", type=str, default=".osint_cache.json", help="Archivo cache JSON")
+    p.add_argument("--cache", type=str, default=None,
+                   help="Archivo cache (.json o .sqlite; por defecto .osint_cache.sqlite, o el .json si ya existe)")
     p.add_argument("--cache-ttl", type=int, default=86400, help="TTL cache (segundos)")
+    p.add_argument("--skip-if-exists", action="store_true",
+                   help="No repetir las búsquedas si results/<consulta>.json tiene menos de --cache-ttl segundos")
     p.add_argument("--max-name-queries", type=int, default=4, help="Máx queries generadas por nombre")
     return p.parse_args()
 
@@ -0,0 +1,137 @@
+# tests/test_extractors.py
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import extractors as ex
+
+# textos con enlaces: usuarios y teléfonos dentro de URLs, correos cuyo
+# dominio también parece un usuario, HTML con href y entidades
+TEXTS = [
+    "https://reddit.com/u/johndoe and https://example.com/user/alice_smith",
+    "https://shop.com/item/12345678",
+    "Contacto: juan.perez@example.com, tel +52 55 1234 5678, @Juan_Perez",
+    "Juan José Lota en https://github.com/jjlota y https://m.facebook.com/jj",
+    '<a href="https://instagram.com/ana_ruiz">Ana Ruiz</a> &amp; 555-1234567',
+    "sin entidades aquí",
+    "",
+]
+
+
+def _expected(text):
+    """Lo que devolvía extract_all antes de fusionar: cada extractor por separado."""
+    return {
+        "emails": ex.extract_emails(text),
+        "phones": ex.extract_phones(text),
+        "links": ex.extract_links(text),
+        "usernames": ex.extract_usernames(text),
+        "social_profiles": ex.extract_social_profiles(text),
+        "names": ex.extract_possible_names(text),
+    }
+
+
+class ExtractAllTest(unittest.TestCase):
+
+    def test_matches_single_purpose_extractors(self):
+        for t in TEXTS:
+            if t:
+                self.assertEqual(ex.extract_all(t), _expected(t), t)
+
+    def test_entities_inside_urls(self):
+        out = ex.extract_all(TEXTS[0])
+        self.assertEqual(out["usernames"], ["johndoe", "alice_smith"])
+        self.assertEqual(ex.extract_all(TEXTS[1])["phones"], ["12345678"])
+
+    def test_empty_text(self):
+        self.assertEqual(ex.extract_all("")["emails"], [])
+        self.assertEqual(ex.extract_all("")["social_profiles"], {})
+
+    def test_result_is_a_fresh_copy(self):
+        first = ex.extract_all(TEXTS[2])
+        first["emails"].append("otro@x.com")
+        self.assertNotIn("otro@x.com", ex.extract_all(TEXTS[2])["emails"])
+
+
+class ExtractAllManyTest(unittest.TestCase):
+
+    def test_equals_extract_all_per_text(self):
+        self.assertEqual(ex.extract_all_many(TEXTS), [ex.extract_all(t) for t in TEXTS])
+
+    def test_no_matches_across_texts(self):
+        # el final de un texto y el inicio del siguiente no forman un teléfono
+        # ni un nombre al unirse
+        out = ex.extract_all_many(["llamar al 1234", "5678 hoy", "Juan", "Pérez"])
+        self.assertEqual([o["phones"] for o in out], [[], [], [], []])
+        self.assertEqual([o["names"] for o in out], [[], [], [], []])
+
+    def test_empty_batch(self):
+        self.assertEqual(ex.extract_all_many([]), [])
+
+
+class StripHtmlTest(unittest.TestCase):
+
+    def test_plain_text_is_returned_as_is(self):
+        text = "sin etiquetas ni entidades"
+        self.assertIs(ex._strip_html(text), text)
+
+    def test_entities_are_decoded_without_tags(self):
+        self.assertEqual(ex._strip_html("a &amp; b"), "a & b")
+        self.assertEqual(ex.extract_emails("ana&#64;x.com"), ["ana@x.com"])
+
+    def test_tags_are_removed(self):
+        self.assertEqual(ex._strip_html("<b>Ana</b> &amp; Luis").split(), ["Ana", "&", "Luis"])
+
+    def test_bare_angle_brackets_keep_the_text_between(self):
+        self.assertEqual(ex._strip_html("a < b x@y.com > c").split(), ["a", "<", "b", "x@y.com", ">", "c"])
+        self.assertEqual(ex.extract_emails("if a < b email x@y.com and c > d"), ["x@y.com"])
+
+
+class MemoizeTest(unittest.TestCase):
+
+    def test_repeated_text_is_scanned_once(self):
+        calls = []
+
+        @ex._memoize
+        def scan(text):
+            calls.append(text)
+            return [text.upper()]
+
+        text = "x" * 100000
+        self.assertEqual(scan(text), [text.upper()])
+        self.assertEqual(scan(text), [text.upper()])
+        self.assertEqual(len(calls), 1)
+        scan.cache_clear()
+        scan(text)
+        self.assertEqual(len(calls), 2)
+
+    def test_size_is_bounded(self):
+        calls = []
+
+        @ex._memoize
+        def scan(text):
+            calls.append(text)
+            return []
+
+        for i in range(ex._MEMO_SIZE + 1):
+            scan(str(i))
+        scan(str(ex._MEMO_SIZE))  # reciente: sigue en caché
+        scan("0")                 # el más antiguo: se expulsó
+        self.assertEqual(len(calls), ex._MEMO_SIZE + 2)
+
+
+class SocialProfilesTest(unittest.TestCase):
+
+    def test_hostname_lookup(self):
+        profiles = ex.extract_social_profiles(
+            "https://www.github.com/a https://m.facebook.com/b "
+            "https://dropbox.com/x.com https://facebook.com/profile.php?id=1"
+        )
+        self.assertEqual(profiles["github"], ["https://www.github.com/a"])
+        self.assertEqual(profiles["facebook"], ["https://m.facebook.com/b"])
+        self.assertEqual(profiles["twitter"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
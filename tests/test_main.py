@@ -0,0 +1,232 @@
+# tests/test_main.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def _args(**kw):
+    base = {"name": None, "email": None, "phone": None, "max_name_queries": 4}
+    base.update(kw)
+    return argparse.Namespace(**base)
+
+
+class BuildQueriesTest(unittest.TestCase):
+
+    def test_no_search_argument(self):
+        self.assertEqual(main.build_queries(_args()), (None, None, []))
+
+    def test_email_queries(self):
+        self.assertEqual(main.build_queries(_args(email=" juan.perez@x.com ")),
+                         ("email", "juan.perez@x.com",
+                          ["juan.perez@x.com", "juan.perez", '"juan.perez@x.com"']))
+        # parte local genérica: no se busca sola
+        self.assertEqual(main.build_queries(_args(email="info@x.com"))[2], ["info@x.com", '"info@x.com"'])
+        # parte local corta: ni sola ni entre comillas
+        self.assertEqual(main.build_queries(_args(email="ab@x.com"))[2], ["ab@x.com"])
+
+    def test_name_queries_interleave_and_cap_emails(self):
+        qtype, value, queries = main.build_queries(_args(name="Juan Pérez", max_name_queries=2))
+        self.assertEqual((qtype, value), ("name", "Juan Pérez"))
+        self.assertEqual(len(queries), len(set(queries)))
+        phrases = [q for q in queries if " " in q]
+        emails = [q for q in queries if "@" in q]
+        self.assertEqual(len(phrases), 2)
+        self.assertEqual(len(emails), 2)
+        # frases y usernames alternados al principio
+        self.assertIn(" ", queries[0])
+        self.assertNotIn(" ", queries[1])
+
+
+class ConsolidateBlocksTest(unittest.TestCase):
+
+    BLOCKS = [
+        {"entities": {"emails": ["a@x.com", "b@x.com"],
+                      "links": ["https://github.com/a", "https://x.com/b"],
+                      "socials": {"github": ["https://github.com/a"]}},
+         "results": [{"engine": "google", "title": "", "link": "https://GitHub.com/a/", "snippet": "uno"},
+                     {"engine": "bing", "title": "T", "link": "https://github.com/a#top", "snippet": "dos"},
+                     "no es un dict"]},
+        {"entities": {"emails": ["a@x.com"], "urls": ["https://github.com/a", "https://e.org"],
+                      "socials": {"github": "https://github.com/z"}},
+         "results": [{"engine": "bing", "title": "E", "link": "https://e.org", "snippet": ""}]},
+        {"entities": None},
+    ]
+
+    def test_entities_dedup_in_order(self):
+        out = main.consolidate_blocks(self.BLOCKS)
+        self.assertEqual(out["emails"], ["a@x.com", "b@x.com"])
+        self.assertEqual(out["urls"], ["https://github.com/a", "https://x.com/b", "https://e.org"])
+        self.assertEqual(out["socials"], {"github": ["https://github.com/a", "https://github.com/z"]})
+        self.assertEqual(out["domain_counts"]["github.com"], 1)
+
+    def test_duplicate_links_collapse_by_canonical_url(self):
+        hits = main.consolidate_blocks(self.BLOCKS)["hits"]
+        self.assertEqual([h.link for h in hits], ["https://GitHub.com/a/", "https://e.org"])
+        self.assertEqual(hits[0].engine, "google")
+
+    def test_duplicate_links_merge_title_and_snippets(self):
+        first = main.consolidate_blocks(self.BLOCKS)["hits"][0]
+        self.assertEqual(first.title, "T")
+        self.assertEqual(first.snippet, "uno | dos")
+
+
+class ScoreHitsTest(unittest.TestCase):
+
+    def test_batch_path_matches_simple_classifier(self):
+        hits = [main.Hit("g", "t", "https://juan.com", "s", "Juan error"),
+                main.Hit("g", "t", "https://github.com/x", "s", "nada"),
+                main.Hit("g", "t", None, "s", "")]
+        expected = [main.SimpleClassifier.score(h.raw, '"juan"', h.link) for h in hits]
+        out = main.score_hits(list(hits), '"juan"')
+        self.assertEqual(sorted(expected, reverse=True), [h.score for h in out])
+        self.assertEqual({h.link: h.category for h in out},
+                         {"https://juan.com": "website", "https://github.com/x": "github", None: "unknown"})
+
+
+class SearchQueriesTest(unittest.TestCase):
+    """search_queries delega en SiteSearcher.batch_search (la red se sustituye)."""
+
+    def setUp(self):
+        from core.site import SiteSearcher
+        self.searcher = SiteSearcher()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.calls = []
+        self.searcher.unified_search = self._fake_search
+
+    def _fake_search(self, q, limit=10, include_socials=True, include_repos=True, extract=True):
+        with self.lock:
+            self.calls.append(q)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        if q == "falla":
+            raise RuntimeError("sin red")
+        return {"query": q, "results": [{"link": "https://e.org"}], "entities": {}, "count": 1,
+                "_extraction_text": f"{q} {q}@example.com"}
+
+    def _run(self, queries, workers):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return main.asyncio.run(main.search_queries(self.searcher, queries, limit=3, workers=workers))
+
+    def test_order_dedupe_and_batch_extraction(self):
+        blocks = self._run(["ana", "luis", "ana"], workers=4)
+        self.assertEqual([b["query"] for b in blocks], ["ana", "luis", "ana"])
+        self.assertEqual(sorted(self.calls), ["ana", "luis"])
+        self.assertEqual(blocks[0]["entities"].get("emails"), ["ana@example.com"])
+        self.assertNotIn("_extraction_text", blocks[1])
+        # cada repetición es una copia independiente
+        self.assertIsNot(blocks[0], blocks[2])
+        self.assertEqual(blocks[0], blocks[2])
+
+    def test_workers_bound_concurrency(self):
+        self._run([f"q{i}" for i in range(6)], workers=2)
+        self.assertEqual(self.peak, 2)
+
+    def test_failed_query_yields_an_error_block(self):
+        blocks = self._run(["falla", "ana"], workers=2)
+        self.assertEqual(blocks[0]["results"], [])
+        self.assertEqual(blocks[0]["error"], "sin red")
+        self.assertEqual(blocks[1]["count"], 1)
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_rule_priority_beats_position(self):
+        # github aparece antes en el texto, pero instagram va primero en _RULES
+        url = "https://github.com/redirect?to=https://instagram.com/ana"
+        self.assertEqual(main._classify_cached(url), "instagram")
+        self.assertEqual(main._classify_cached("https://x.com/a?via=tiktok.com"), "twitter")
+
+    def test_domain_boundary(self):
+        self.assertEqual(main._classify_cached("https://www.X.com/ana"), "twitter")
+        self.assertEqual(main._classify_cached("https://dropbox.com/ana"), "website")
+
+    def test_empty_url(self):
+        self.assertEqual(main.SimpleClassifier.classify(""), "unknown")
+        self.assertEqual(main.SimpleClassifier.classify(None), "unknown")
+
+
+
+class RawBlocksSpliceTest(unittest.TestCase):
+
+    SUMMARY = {"query_value": "ñandú", "top_domains": [["a.com", 2]], "vacío": {}}
+    HITS = [main.Hit("g", "línea\nnueva \"x\"", "https://a.com", "s", "", "website", 3)]
+
+    def _check(self, blocks):
+        head = main._dumps_pretty({"summary": self.SUMMARY, "hits": self.HITS})
+        full = main._dumps_pretty({"summary": self.SUMMARY, "hits": self.HITS, "raw_blocks": blocks})
+        self.assertEqual(main._append_raw_blocks(head, blocks), full)
+        self.assertEqual(json.loads(full)["raw_blocks"], blocks)
+
+    def test_matches_full_serialization(self):
+        for blocks in ([], [{"query": "a", "results": [{"x": [1, {}]}], "entities": {}}]):
+            self._check(blocks)
+
+    def test_matches_without_orjson(self):
+        with mock.patch.object(main, "orjson", None):
+            self._check([{"query": "b", "results": [], "count": 0}])
+
+
+class LoadCoreTest(unittest.TestCase):
+
+    def _reload(self):
+        main._get_module.cache_clear()
+        main._load_core.cache_clear()
+        del main.MISSING[:]
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            main._load_core()
+        return buf.getvalue()
+
+    def test_warning_lists_missing_name_utils(self):
+        real = main.importlib.util.find_spec
+        fake = lambda name, *a: None if name == "core.name_utils" else real(name, *a)
+        try:
+            with mock.patch.object(main.importlib.util, "find_spec", fake):
+                out = self._reload()
+        finally:
+            self._reload()
+        self.assertIn("core.name_utils", out)
+        self.assertEqual(out.count("Advertencia"), 1)
+
+
+class SkipIfExistsTest(unittest.TestCase):
+
+    def test_cached_run_returns_hits_like_a_normal_run(self):
+        hit = main.Hit("google", "t", "https://github.com/ana", "s", "", "github", 4).as_dict()
+        stored = {"summary": {"query_value": "555123", "top_hits": [hit]}, "hits": [hit], "raw_blocks": []}
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                os.makedirs("results")
+                with open(os.path.join("results", "555123.json"), "w", encoding="utf-8") as f:
+                    json.dump(stored, f)
+                argv = ["main.py", "--phone", "555123", "--skip-if-exists"]
+                with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(io.StringIO()):
+                    out = main.run_orchestrator(main.parse_args())
+            finally:
+                os.chdir(cwd)
+        self.assertIsInstance(out["hits"][0], main.Hit)
+        self.assertIsInstance(out["summary"]["top_hits"][0], main.Hit)
+        self.assertEqual(out["hits"][0].as_dict(), hit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+# tests/test_name_utils.py
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import name_utils
+
+NAMES = ["Juan Pérez", "María José García López", "Ana", "Li Wei Zhang", "   "]
+
+
+class EmailVariantsTest(unittest.TestCase):
+
+    def test_limit_is_a_prefix_of_the_full_list(self):
+        for name in NAMES:
+            for per_domain in (3, 6):
+                full = name_utils.email_variants_from_name(name, max_per_domain=per_domain)
+                for limit in range(0, len(full) + 2):
+                    got = name_utils.email_variants_from_name(name, max_per_domain=per_domain, limit=limit)
+                    self.assertEqual(got, full[:limit], (name, per_domain, limit))
+
+    def test_no_duplicates_and_domain_hints_first(self):
+        out = name_utils.email_variants_from_name("Juan Pérez", domain_hints=["corp.com"], max_per_domain=2)
+        self.assertEqual(len(out), len(set(out)))
+        self.assertTrue(out[0].endswith("@corp.com"))
+        self.assertTrue(all(e.count("@") == 1 for e in out))
+
+
+if __name__ == "__main__":
+    unittest.main()
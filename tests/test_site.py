@@ -0,0 +1,53 @@
+# tests/test_site.py
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import extractors, site, utils
+
+
+class FallbackExtractTest(unittest.TestCase):
+
+    def test_same_keys_as_extract_all(self):
+        text = "Ana ana@x.com +34 600 123 456 https://github.com/ana"
+        out = site._fallback_extract_all(text)
+        self.assertEqual(set(out), set(extractors.extract_all(text)))
+        self.assertEqual(out["usernames"], [])
+        self.assertEqual(out["names"], [])
+        self.assertEqual(out["emails"], ["ana@x.com"])
+        self.assertEqual(out["social_profiles"], {"github": ["https://github.com/ana"]})
+
+
+class UnifiedSearchCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = utils.SimpleCache(os.path.join(tmp.name, "c.json"), ttl=60)
+        self.addCleanup(self.cache.close)
+        self.searcher = site.SiteSearcher(cache=self.cache)
+        self.calls = 0
+        self.searcher._unified_search = self._fake_search
+
+    def _fake_search(self, name, limit, include_socials, include_repos, extract):
+        self.calls += 1
+        return {"query": name, "results": [{"link": f"https://e.org/{self.calls}"}], "entities": {}}
+
+    def test_repeat_is_served_from_cache_until_ttl(self):
+        first = self.searcher.unified_search("ana")
+        first["results"].clear()  # el llamador puede modificar su copia
+        self.assertEqual(self.searcher.unified_search("ana")["results"], [{"link": "https://e.org/1"}])
+        self.assertEqual(self.calls, 1)
+        # pasada la TTL de la caché se vuelve a buscar
+        now = utils.time.time()
+        with mock.patch.object(utils.time, "time", return_value=now + 61):
+            self.assertEqual(self.searcher.unified_search("ana")["results"], [{"link": "https://e.org/2"}])
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
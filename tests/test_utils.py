@@ -0,0 +1,205 @@
+# tests/test_utils.py
+import asyncio
+import csv
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import utils
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/throttled responde 429 (Retry-After: 0) la primera vez y 200 después; /always429 siempre 429."""
+    hits = {}
+
+    def do_GET(self):
+        n = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/always429" or (self.path == "/throttled" and n == 1):
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            body = b"slow down"
+        else:
+            self.send_response(200)
+            body = b"ok"
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class _CountingLimiter:
+    def __init__(self):
+        self.waits = 0
+        self.deferred = []
+
+    async def wait_async(self, url):
+        self.waits += 1
+
+    def defer(self, url, seconds):
+        self.deferred.append(seconds)
+
+
+class _BrokenLimiter:
+    """Limiter cuyas llamadas fallan todas."""
+
+    def wait(self, url):
+        raise RuntimeError("limiter roto")
+
+    async def wait_async(self, url):
+        raise RuntimeError("limiter roto")
+
+    def defer(self, url, seconds):
+        raise RuntimeError("limiter roto")
+
+
+class MakeRequestAsyncTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.hits.clear()
+
+    def _get(self, path, cache, limiter):
+        return asyncio.run(utils.make_request_async(self.base + path, cache=cache, limiter=limiter, timeout=5))
+
+    def test_retry_after_then_cache_hit_skips_limiter(self):
+        cache, limiter = _DictCache(), _CountingLimiter()
+        self.assertEqual(self._get("/throttled", cache, limiter), (200, "ok"))
+        self.assertEqual(limiter.deferred, [0.0])
+        self.assertEqual(_Handler.hits["/throttled"], 2)
+        waits = limiter.waits
+        # segunda vez: sale de la caché, sin esperar al limiter ni ir a la red
+        self.assertEqual(self._get("/throttled", cache, limiter), (200, "ok"))
+        self.assertEqual(limiter.waits, waits)
+        self.assertEqual(_Handler.hits["/throttled"], 2)
+
+    def test_throttled_response_is_not_cached(self):
+        cache = _DictCache()
+        status, _ = self._get("/always429", cache, _CountingLimiter())
+        self.assertEqual(status, 429)
+        self.assertEqual(cache.data, {})
+
+    def test_broken_limiter_still_retries(self):
+        self.assertEqual(self._get("/throttled", None, _BrokenLimiter()), (200, "ok"))
+        self.assertEqual(_Handler.hits["/throttled"], 2)
+
+    def test_sync_broken_limiter_still_retries(self):
+        status, text = utils.make_request(self.base + "/throttled", use_cache=False,
+                                          limiter=_BrokenLimiter(), timeout=5)
+        self.assertEqual((status, text), (200, "ok"))
+        self.assertEqual(_Handler.hits["/throttled"], 2)
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_simple_cache_round_trip(self):
+        path = self._path("c.json")
+        cache = utils.SimpleCache(path=path, flush_every=3600)
+        cache.set("GET:u", {"status_code": 200, "text": "ñ"})
+        self.assertEqual(cache.get("GET:u"), {"status_code": 200, "text": "ñ"})
+        cache.close()
+        self.assertEqual(utils.SimpleCache(path=path).get("GET:u"), {"status_code": 200, "text": "ñ"})
+
+    def test_simple_cache_own_writes_are_not_external_changes(self):
+        path = self._path("c.json")
+        cache = utils.SimpleCache(path=path, flush_every=0)
+        cache.set("a", 1)
+        self.assertFalse(cache.changed_on_disk())
+        # otro proceso reescribe el archivo
+        other = utils.SimpleCache(path=path, flush_every=0)
+        time.sleep(0.01)
+        other.set("b", 2)
+        self.assertTrue(cache.changed_on_disk())
+
+    def test_simple_cache_ttl(self):
+        cache = utils.SimpleCache(path=self._path("c.json"), ttl=0)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        self.assertIsNone(cache.get("a"))
+
+    def test_sqlite_cache_round_trip(self):
+        path = self._path("c.sqlite")
+        cache = utils.open_cache(path)
+        self.assertIsInstance(cache, utils.SqliteCache)
+        cache.set("GET:u", {"status_code": 200, "text": "x"})
+        self.assertFalse(cache.changed_on_disk())
+        cache.close()
+        reopened = utils.SqliteCache(path=path)
+        self.assertEqual(reopened.get("GET:u"), {"status_code": 200, "text": "x"})
+        self.assertIsNone(reopened.get("missing"))
+        reopened.close()
+
+
+
+class SanitizeFilenameTest(unittest.TestCase):
+
+    @staticmethod
+    def _reference(s):
+        # implementación original con dos re.sub
+        s2 = re.sub(r"[^\w\-_\. ]", "_", s.strip().lower())
+        return re.sub(r"\s+", "_", s2)[:240]
+
+    def test_matches_regex_reference(self):
+        for s in ["Juan Pérez", "  a/b\\c:d  ", "x\ty  z", "ñandú\u00a0ü", "a" * 300, "mail@x.com", ""]:
+            self.assertEqual(utils.sanitize_filename(s), self._reference(s), repr(s))
+
+class CsvHelpersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _read(self, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_save_csv_rows_accepts_a_generator(self):
+        path = os.path.join(self.tmp.name, "rows.csv")
+        utils.save_csv_rows(path, ["a", "b"], ((i, None) for i in range(2)))
+        self.assertEqual(self._read(path), [["a", "b"], ["0", ""], ["1", ""]])
+
+    def test_save_dicts_to_csv_quotes_and_joins_lists(self):
+        path = os.path.join(self.tmp.name, "dicts.csv")
+        rows = iter([{"title": 'a, "b"', "tags": ["x", "y"], "extra": 1}, {"title": "c"}])
+        utils.save_dicts_to_csv(path, ["title", "tags"], rows)
+        self.assertEqual(self._read(path), [["title", "tags"], ['a, "b"', "x;y"], ["c", ""]])
+
+
+if __name__ == "__main__":
+    unittest.main()